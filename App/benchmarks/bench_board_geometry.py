@@ -0,0 +1,196 @@
+"""Coordinate parsing: old per-call string parsing vs the precomputed board tables.
+
+Run from the App folder:
+    python benchmarks/bench_board_geometry.py
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website.board import PARTIAL_SQUARES
+from website.views import parse_coordinate_safe, time_calculator_main, check_main_square_intersection
+
+
+# Copies of the string-parsing versions, kept only as the baseline.
+
+def legacy_parse_coordinate_safe(coord_str):
+
+    try:
+
+        p_char = coord_str[0]
+        x_char = coord_str[1]
+        y_str = coord_str[2:]
+
+
+        x = ord(x_char) - ord('a') + 1
+        y = int(y_str)
+
+
+        if p_char not in '1234' or not (1 <= x <= 10) or not (1 <= y <= 10):
+            return None
+
+    except (IndexError, ValueError, TypeError):
+
+        return None
+
+
+    if p_char == '1':
+        X = x - 0.75
+        Y = y - 0.75
+    elif p_char == '2':
+        X = x - 0.25
+        Y = y - 0.75
+    elif p_char == '3':
+        X = x - 0.25
+        Y = y - 0.25
+    else:
+        X = x - 0.75
+        Y = y - 0.25
+
+
+    return (X, Y, x, y)
+
+
+def legacy_time_calculator_main(l, k):
+    if (len(l) != 3 and len(l) != 4) or (len(l) == 4 and l[3] != '0') or (len(l) == 3 and l[2] not in '123456789'):
+        return "Invalid coordinate"
+    x1 = ord(l[1]) - ord('a') + 1
+    if x1 > 10 or x1 < 1:
+        return "Invalid coordinate"
+    if len(l) == 4:
+        y1 = 10
+    elif len(l) == 3 and (l[2] in '123456789'):
+        y1 = int(l[2])
+    if (len(k) != 3 and len(k) != 4) or (len(k) == 4 and k[3] != '0') or (len(k) == 3 and k[2] not in '123456789'):
+        return "Invalid coordinate"
+    x2 = ord(k[1]) - ord('a') + 1
+    if x2 > 10 or x2 < 1:
+        return "Invalid coordinate"
+    if len(k) == 4:
+        y2 = 10
+    elif len(k) == 3 and (k[2] in '123456789'):
+        y2 = int(k[2])
+    if l[0] == '1':
+        X1 = x1 - 0.75
+        Y1 = y1 - 0.75
+    elif l[0] == '2':
+        X1 = x1 - 0.25
+        Y1 = y1 - 0.75
+    elif l[0] == '3':
+        X1 = x1 - 0.25
+        Y1 = y1 - 0.25
+    elif l[0] == '4':
+        X1 = x1 - 0.75
+        Y1 = y1 - 0.25
+    else:
+        return "Invalid coordinate"
+    if k[0] == '1':
+        X2 = x2 - 0.75
+        Y2 = y2 - 0.75
+    elif k[0] == '2':
+        X2 = x2 - 0.25
+        Y2 = y2 - 0.75
+    elif k[0] == '3':
+        X2 = x2 - 0.25
+        Y2 = y2 - 0.25
+    elif k[0] == '4':
+        X2 = x2 - 0.75
+        Y2 = y2 - 0.25
+    else:
+        return "Invalid coordinate"
+    d_in = ((X2-X1)**2 + (Y2-Y1)**2)**(1/2)
+    d_hard = ((9.75-0.25)**2 + (9.75-0.25)**2)**(1/2)
+    t_hard = 21600
+    t_out = t_hard * (d_in/d_hard)
+
+    return {
+        "t_out": t_out,
+        "X1": X1, "Y1": Y1,
+        "X2": X2, "Y2": Y2
+    }
+
+
+def legacy_check_main_square_intersection(l, k, main_square):
+
+    try:
+        if (len(l) != 3 and len(l) != 4) or (len(l) == 4 and l[3] != '0') or (len(l) == 3 and l[2] not in '123456789'): return False
+        x1 = ord(l[1]) - ord('a') + 1
+        if x1 > 10 or x1 < 1: return False
+        y1 = 10 if len(l) == 4 else int(l[2])
+        if (len(k) != 3 and len(k) != 4) or (len(k) == 4 and k[3] != '0') or (len(k) == 3 and k[2] not in '123456789'): return False
+        x2 = ord(k[1]) - ord('a') + 1
+        if x2 > 10 or x2 < 1: return False
+        y2 = 10 if len(k) == 4 else int(k[2])
+        if l[0] == '1': X1, Y1 = x1 - 0.75, y1 - 0.75
+        elif l[0] == '2': X1, Y1 = x1 - 0.25, y1 - 0.75
+        elif l[0] == '3': X1, Y1 = x1 - 0.25, y1 - 0.25
+        elif l[0] == '4': X1, Y1 = x1 - 0.75, y1 - 0.25
+        else: return False
+        if k[0] == '1': X2, Y2 = x2 - 0.75, y2 - 0.75
+        elif k[0] == '2': X2, Y2 = x2 - 0.25, y2 - 0.75
+        elif k[0] == '3': X2, Y2 = x2 - 0.25, y2 - 0.25
+        elif k[0] == '4': X2, Y2 = x2 - 0.75, y2 - 0.25
+        else: return False
+
+        if not (2 <= len(main_square) <= 3): return False
+        x3 = ord(main_square[0]) - ord('a') + 1
+        y3 = int(main_square[1:])
+        if not (1 <= x3 <= 10) or not (1 <= y3 <= 10): return False
+
+        x11, y11 = x3 - 1, y3 - 1
+        x12, y12 = x3,     y3 - 1
+        x21, y21 = x3 - 1, y3
+        x22, y22 = x3,     y3
+
+        a = (Y2 - Y1)*(x11 - X1) - (X2 - X1)*(y11 - Y1)
+        b = (Y2 - Y1)*(x12 - X1) - (X2 - X1)*(y12 - Y1)
+        c = (Y2 - Y1)*(x21 - X1) - (X2 - X1)*(y21 - Y1)
+        d = (Y2 - Y1)*(x22 - X1) - (X2 - X1)*(y22 - Y1)
+        if X1 < X2:
+            X_low_limit = x1 - 1
+            X_high_limit = x2
+        else:
+            X_low_limit = x2 - 1
+            X_high_limit = x1
+        if Y1 > Y2:
+            Y_low_limit = y1
+            Y_high_limit = y2 - 1
+        else:
+            Y_low_limit = y2
+            Y_high_limit = y1 - 1
+        if (a > 0 and b > 0 and c > 0 and d > 0) or (a < 0 and b < 0 and c < 0 and d < 0) or (x3 - 0.5) < X_low_limit or (x3 - 0.5) > X_high_limit or (y3 - 0.5) > Y_low_limit or (y3 - 0.5) < Y_high_limit:
+            return False
+        else:
+            return True
+    except Exception as e:
+        print(f"Error caused by creating jungle-squares: {e}")
+        return False
+
+
+def bench(label, fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {len(args_list) / elapsed / 1e3:9.1f} k calls/s")
+    return elapsed
+
+
+if __name__ == '__main__':
+    random.seed(0)
+    codes = list(PARTIAL_SQUARES)
+    singles = [(random.choice(codes),) for _ in range(200000)]
+    pairs = [(random.choice(codes), random.choice(codes)) for _ in range(200000)]
+    triples = [(l, k, random.choice(['c6', 'h4', 'e8', 'i8'])) for l, k in pairs]
+
+    for label, old, new, args_list in [
+        ('parse_coordinate_safe', legacy_parse_coordinate_safe, parse_coordinate_safe, singles),
+        ('time_calculator_main', legacy_time_calculator_main, time_calculator_main, pairs),
+        ('check_main_square_intersection', legacy_check_main_square_intersection, check_main_square_intersection, triples),
+    ]:
+        old_time = bench(f"{label} (string parsing)", old, args_list)
+        new_time = bench(f"{label} (board tables)", new, args_list)
+        print(f"{'':<45} {old_time / new_time:9.1f}x")
@@ -0,0 +1,82 @@
+"""SQL statements and latency of a warm dashboard GET.
+
+Seeds a throwaway database with one room of N players, logs in as a Seeker and as the
+Gamemaster, and reads X-Query-Count from repeated GET /game_dashboard requests, once on
+the database path and once with the in-memory room state engine.
+
+Run from the App folder:
+    python benchmarks/bench_dashboard_queries.py [players] [requests]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website import create_app, db
+from website.models import User, GameRoom, PlayerState
+
+
+def seed(players):
+    users = [User(email=f"p{i}@x.com", first_name=f"Player {i}", password='x', score=0) for i in range(players + 1)]
+    db.session.add_all(users)
+    db.session.flush()
+
+    room = GameRoom(room_name='Bench', host_id=users[0].id, beast_square_1='c6', beast_square_2='h4')
+    db.session.add(room)
+    db.session.flush()
+
+    db.session.add(PlayerState(user_id=users[0].id, room_id=room.id, role='Gamemaster'))
+    for i, user in enumerate(users[1:]):
+        db.session.add(PlayerState(
+            user_id=user.id, room_id=room.id,
+            team='TeamA' if i % 2 == 0 else 'TeamB',
+            role='Hider' if i < 2 else 'Seeker',
+            current_location='3d5' if i % 3 == 0 else '2f8'
+        ))
+    db.session.commit()
+    return users[0].id, users[-1].id
+
+
+def measure(app, user_id, requests):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    # Warm-up: compiles the template and, with the engine on, loads the room into memory.
+    # The GET writes nothing; herb spawns and daily resets run in the scheduler.
+    client.get('/game_dashboard')
+    counts = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/game_dashboard')
+        assert response.status_code == 200, response.status_code
+        counts.append(int(response.headers['X-Query-Count']))
+    elapsed = time.perf_counter() - start
+    return min(counts), max(counts), elapsed / requests * 1000
+
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    for engine in (False, True):
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'TESTING': True,
+            'QUERY_COUNT_HEADER': True,
+            'ROOM_STATE_ENGINE': engine
+        })
+        with app.app_context():
+            if not engine:
+                db.create_all()
+                gamemaster_id, seeker_id = seed(players)
+
+        label = 'room state engine' if engine else 'database'
+        for who, user_id in (('seeker', seeker_id), ('gamemaster', gamemaster_id)):
+            low, high, ms = measure(app, user_id, requests)
+            queries = str(low) if low == high else f"{low}-{high}"
+            print(f"{label:18} {who:10} {queries:>5} queries/request  {ms:7.2f} ms/request")
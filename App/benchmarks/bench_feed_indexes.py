@@ -0,0 +1,139 @@
+"""Hot read queries on a seeded database, with and without the composite indexes.
+
+Seeds a throwaway SQLite file (1M game_log rows by default, spread over 50 rooms),
+prints EXPLAIN QUERY PLAN and timings for the activity feed, notification and
+player lookups, then drops the composite indexes and runs them again.
+Exits with 1 if any query still scans a whole table while the indexes exist.
+
+Run from the App folder:
+    python benchmarks/bench_feed_indexes.py [log_rows] [db_path]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from sqlalchemy import text
+
+from website import db
+from website.models import GameLog, GameChat, PlayerState, Notification
+from website.activity_feed import load_feed, feed_streams
+
+
+ROOMS = 50
+USERS = 2000
+INDEXED_TABLES = (GameLog, GameChat, PlayerState, Notification)
+
+
+def seed(path, log_rows):
+    random.seed(0)
+    start = datetime(2026, 1, 1)
+    stamp = lambda i: (start + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO user (id, email, first_name, score) VALUES (?, ?, ?, 0)",
+                     ((i, f"u{i}@x.com", f"U{i}") for i in range(1, USERS + 1)))
+    conn.executemany("INSERT INTO game_room (id, room_name) VALUES (?, ?)",
+                     ((i, f"Room {i}") for i in range(1, ROOMS + 1)))
+    conn.executemany(
+        "INSERT INTO player_state (user_id, room_id, team, role) VALUES (?, ?, ?, ?)",
+        ((i, i % ROOMS + 1, random.choice(['TeamA', 'TeamB']), random.choice(['Seeker', 'Hider'])) for i in range(1, USERS + 1)))
+    conn.executemany(
+        "INSERT INTO game_log (id, timestamp, log_message, user_id, room_id, team_id, privacy) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, stamp(i), f"Log message number {i}", random.randint(1, USERS), random.randint(1, ROOMS),
+          random.choice(['TeamA', 'TeamB']), random.choice(['public', 'team', 'private'])) for i in range(1, log_rows + 1)))
+    conn.executemany(
+        "INSERT INTO game_chat (id, timestamp, message_body, user_id, room_id, scope, team_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, stamp(i), f"Chat {i}", random.randint(1, USERS), random.randint(1, ROOMS),
+          *random.choice([('global', None), ('team', 'TeamA'), ('team', 'TeamB')])) for i in range(1, log_rows // 10 + 1)))
+    conn.executemany(
+        "INSERT INTO notification (id, user_id, message, is_read, timestamp) VALUES (?, ?, ?, ?, ?)",
+        ((i, random.randint(1, USERS), f"Notification {i}", random.random() < 0.95, stamp(i)) for i in range(1, log_rows // 10 + 1)))
+    conn.commit()
+    conn.close()
+
+
+def hot_queries(player, gamemaster):
+    """The ORM queries the views run, as (name, query)."""
+    queries = []
+    for state, who in ((player, 'player'), (gamemaster, 'gm')):
+        for name, (model, query) in feed_streams(state, state.user_id).items():
+            queries.append((f"{who} {name}", query.order_by(model.timestamp.desc(), model.id.desc()).limit(20)))
+    queries.append(('unread notifications', Notification.query.filter_by(
+        user_id=player.user_id, is_read=False).order_by(Notification.timestamp.asc())))
+    queries.append(('enemy seekers', PlayerState.query.filter(
+        PlayerState.room_id == player.room_id, PlayerState.team != player.team, PlayerState.role == 'Seeker')))
+    queries.append(('team hiders', PlayerState.query.filter_by(
+        room_id=player.room_id, team=player.team, role='Hider')))
+    return queries
+
+
+def query_plan(query):
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+
+def timed(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(player, gamemaster):
+    results = {}
+    for name, query in hot_queries(player, gamemaster):
+        results[name] = (query_plan(query), timed(query.all))
+
+    _, cursors, _ = load_feed(player, player.user_id)
+    results['load_feed (first poll)'] = ([], timed(lambda: load_feed(player, player.user_id)))
+    results['load_feed (idle poll)'] = ([], timed(lambda: load_feed(player, player.user_id, cursors)))
+    return results
+
+
+if __name__ == '__main__':
+    log_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    with app.app_context():
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            db.create_all()
+            start = time.perf_counter()
+            seed(path, log_rows)
+            print(f"seeded {log_rows} log rows into {path} in {time.perf_counter() - start:.1f}s")
+
+        player = PlayerState.query.filter_by(role='Seeker').first()
+        gamemaster = PlayerState(user_id=player.user_id, room_id=player.room_id, team=player.team, role='Gamemaster')
+
+        indexed = run(player, gamemaster)
+
+        for model in INDEXED_TABLES:
+            for index in model.__table__.indexes:
+                db.session.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        db.session.commit()
+        plain = run(player, gamemaster)
+
+        for model in INDEXED_TABLES:
+            for index in model.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+
+    full_scans = []
+    print(f"\n{'query':32} {'no index':>10} {'indexed':>10}   plan")
+    for name, (plan, ms) in indexed.items():
+        print(f"{name:32} {plain[name][1]:8.2f}ms {ms:8.2f}ms   {'; '.join(plan)}")
+        if any(step.startswith('SCAN ') and 'USING' not in step for step in plan):
+            full_scans.append(name)
+
+    if full_scans:
+        print(f"\nfull table scans with indexes present: {', '.join(full_scans)}")
+    sys.exit(1 if full_scans else 0)
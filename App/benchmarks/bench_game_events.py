@@ -0,0 +1,87 @@
+"""Free-text GameLog rows against typed event rows.
+
+Inserts the same move events into two throwaway SQLite files, once as the English
+sentence the feed used to store and once as typed rows, then prints insert time, file
+size per row, and the time to count one room's moves from each form.
+
+Run from the App folder:
+    python benchmarks/bench_game_events.py [rows]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website import create_app, db
+from website.models import User, GameRoom, GameLog
+
+
+ROOMS = 20
+USERS = 200
+
+
+def seed_users():
+    users = [User(email=f"u{i}@x.com", first_name=f"Player {i}", password='x', score=0) for i in range(USERS)]
+    db.session.add_all(users)
+    db.session.flush()
+    rooms = [GameRoom(room_name=f"Room {i}", host_id=users[0].id) for i in range(ROOMS)]
+    db.session.add_all(rooms)
+    db.session.commit()
+    return [u.id for u in users], [r.id for r in rooms]
+
+
+def events(rows, user_ids, room_ids):
+    rng = random.Random(7)
+    squares = [f"{q}{c}{n}" for q in '1234' for c in 'bcdefghi' for n in range(2, 10)]
+    for _ in range(rows):
+        yield rng.choice(user_ids), rng.choice(room_ids), rng.choice(('TeamA', 'TeamB')), rng.choice(squares), rng.choice(squares)
+
+
+def insert(rows, typed):
+    user_ids, room_ids = seed_users()
+    names = {user.id: user.first_name for user in User.query.all()}
+    batch = []
+    start = time.perf_counter()
+    for user_id, room_id, team, from_square, square in events(rows, user_ids, room_ids):
+        if typed:
+            batch.append(GameLog(kind='move', user_id=user_id, room_id=room_id, team_id=team, privacy='team',
+                                 square=square, from_square=from_square))
+        else:
+            batch.append(GameLog(log_message=f"Seeker '{names[user_id]}' ({team}) moved from '{from_square}' to '{square}'.",
+                                 user_id=user_id, room_id=room_id, team_id=team, privacy='team'))
+        if len(batch) == 1000:
+            db.session.add_all(batch)
+            db.session.commit()
+            batch = []
+    db.session.add_all(batch)
+    db.session.commit()
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if typed:
+        moves = GameLog.query.filter(GameLog.room_id == room_ids[0], GameLog.kind == 'move').count()
+    else:
+        moves = GameLog.query.filter(GameLog.room_id == room_ids[0], GameLog.log_message.like('% moved from %')).count()
+    count_ms = (time.perf_counter() - start) * 1000
+    return elapsed, moves, count_ms
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for typed in (False, True):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True, 'SCHEDULER_ENABLED': False})
+        with app.app_context():
+            db.create_all()
+            elapsed, moves, count_ms = insert(rows, typed)
+            db.session.execute(db.text('VACUUM'))
+            db.session.remove()
+            db.engine.dispose()
+        size = os.path.getsize(path)
+        label = 'typed events' if typed else 'free text'
+        print(f"{label:13} insert {rows / elapsed:9.0f} rows/s  {size / rows:6.1f} bytes/row  "
+              f"count room moves {moves:6} in {count_ms:6.2f} ms")
@@ -0,0 +1,60 @@
+"""Beast territory checks: check_main_square_intersection vs the precomputed crossing index.
+
+Verifies the index against the scalar function for every (start, end) pair, then times
+a lunar-eclipse style check (all four jungle squares).
+
+Run from the App folder:
+    python benchmarks/bench_intersection_index.py             # jungle squares only
+    python benchmarks/bench_intersection_index.py --all       # all 100 main squares (slow)
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website.board import JUNGLE_SQUARES, MAIN_SQUARES
+from website.travel_matrix import travel_matrix, build_crossing_index, main_square_mask, MAIN_SQUARE_BITS, SQUARE_CODES
+from website.views import check_main_square_intersection
+
+
+def verify(main_squares):
+    mismatches = 0
+    for start in SQUARE_CODES:
+        for end in SQUARE_CODES:
+            crossed = travel_matrix.crossed_main_squares(start, end)
+            for main_square in main_squares:
+                if bool(crossed & MAIN_SQUARE_BITS[main_square]) != check_main_square_intersection(start, end, main_square):
+                    mismatches += 1
+    return mismatches
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    build_crossing_index()
+    print(f"index build: {time.perf_counter() - start:.2f}s")
+    travel_matrix.load()
+
+    main_squares = list(MAIN_SQUARES) if '--all' in sys.argv else sorted(JUNGLE_SQUARES)
+    mismatches = verify(main_squares)
+    print(f"verified {len(SQUARE_CODES) ** 2} pairs x {len(main_squares)} main squares: {mismatches} mismatches")
+
+    random.seed(0)
+    moves = [(random.choice(SQUARE_CODES), random.choice(SQUARE_CODES)) for _ in range(100000)]
+    beasts = sorted(JUNGLE_SQUARES)
+
+    start = time.perf_counter()
+    for l, k in moves:
+        [b for b in beasts if check_main_square_intersection(l, k, b)]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    beast_mask = main_square_mask(beasts)
+    for l, k in moves:
+        travel_matrix.crossed_main_squares(l, k) & beast_mask
+    new = time.perf_counter() - start
+
+    print(f"scalar checks : {len(moves) / old / 1e3:8.1f} k moves/s")
+    print(f"index lookup  : {len(moves) / new / 1e3:8.1f} k moves/s  ({old / new:.1f}x)")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,85 @@
+"""INSERT statements and commits per game action, with and without the log buffer.
+
+Seeds a throwaway database with one room (violence on, an enemy Seeker next to the mover),
+then runs a move that ends in a duel, a search, a gather and a violence toggle, counting
+the INSERT statements and COMMITs each one sends to SQLite.
+
+Run from the App folder:
+    python benchmarks/bench_log_buffer.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import event
+
+from website import create_app, db
+from website.models import User, GameRoom, PlayerState
+
+
+ACTIONS = (
+    ('move + duel', 'post', '/game_dashboard', {'data': {'action': 'move', 'new_location': '2d6'}}),
+    ('search', 'post', '/game_dashboard', {'data': {'action': 'search'}}),
+    ('gather', 'post', '/game_dashboard', {'data': {'action': 'gather'}}),
+    ('toggle violence', 'post', '/api/toggle_violence', {'json': {'enabled': False}}),
+)
+
+
+def seed():
+    users = [User(email=f"p{i}@x.com", first_name=f"Player {i}", password='x', score=0) for i in range(4)]
+    db.session.add_all(users)
+    db.session.flush()
+    room = GameRoom(room_name='Bench', host_id=users[0].id, beast_square_1='c6', beast_square_2='h4', violence_enabled=True)
+    db.session.add(room)
+    db.session.flush()
+    db.session.add_all([
+        PlayerState(user_id=users[0].id, room_id=room.id, team='TeamA', role='Seeker', current_location='3d5', spirit_class='Dragon'),
+        PlayerState(user_id=users[1].id, room_id=room.id, team='TeamA', role='Hider', current_location='1c3'),
+        PlayerState(user_id=users[2].id, room_id=room.id, team='TeamB', role='Seeker', current_location='1d6', spirit_class='Tiger'),
+        PlayerState(user_id=users[3].id, room_id=room.id, team='TeamB', role='Hider', current_location='4g6'),
+    ])
+    db.session.commit()
+    return users[0].id
+
+
+def run(log_buffer):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True,
+                      'SCHEDULER_ENABLED': False, 'LOG_BUFFER': log_buffer})
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+        counts = {'insert': 0, 'commit': 0}
+
+        def count_insert(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT'):
+                counts['insert'] += 1
+
+        def count_commit(conn):
+            counts['commit'] += 1
+
+        event.listen(db.engine, 'before_cursor_execute', count_insert)
+        event.listen(db.engine, 'commit', count_commit)
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    client.get('/game_dashboard')
+
+    results = []
+    for label, method, url, kwargs in ACTIONS:
+        counts['insert'] = counts['commit'] = 0
+        response = getattr(client, method)(url, **kwargs)
+        assert response.status_code in (200, 302), response.status_code
+        results.append((label, counts['insert'], counts['commit']))
+    return results
+
+
+if __name__ == '__main__':
+    for log_buffer in (False, True):
+        label = 'log buffer' if log_buffer else 'session.add'
+        for action, inserts, commits in run(log_buffer):
+            print(f"{label:12} {action:16} {inserts:2} INSERT  {commits:2} COMMIT")
@@ -0,0 +1,111 @@
+"""Renders per second of the dashboard map: old per-request pyplot figure vs cached board layer.
+
+Run from the App folder:
+    python benchmarks/bench_map_render.py
+"""
+import io
+import os
+import sys
+import time
+import base64
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.image as mpimg
+
+from website.views import visible_beast_squares, build_game_map_markers, parse_coordinate_safe
+from website.map_render import render_game_map_png
+
+
+def legacy_generate_game_map_plot(current_player_state, teammates, enemies, is_detecting, beast_locations=None):
+    # Copy of the pre-cache renderer (player view), kept only as the baseline.
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.set_xlim(0, 10)
+    ax.set_ylim(10, 0)
+    ax.set_xticks(range(10))
+    ax.set_yticks(range(10))
+    ax.set_xticklabels([])
+    ax.set_yticklabels([])
+    for i, label in enumerate(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']):
+        ax.text(i + 0.5, -0.5, label, ha='center', va='top')
+    for i, label in enumerate(['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']):
+        ax.text(-0.3, i + 0.5, label, ha='right', va='center')
+    plt.grid(True, linestyle='--')
+
+    if current_player_state.has_ly_sau_thao and beast_locations:
+        for beast_loc in beast_locations:
+            x = ord(beast_loc[0]) - ord('a') + 0.5
+            y = int(beast_loc[1:]) - 0.5
+            ax.plot(x, y, 'rx', markersize=35, markeredgewidth=5, alpha=0.4, zorder=1)
+
+    for teammate in teammates:
+        if teammate.user_id == current_player_state.user_id: continue
+        TM_X, TM_Y, _, _ = parse_coordinate_safe(teammate.current_location)
+        ax.plot(TM_X, TM_Y, 'o', color='blue', markersize=8, alpha=0.7)
+        ax.text(TM_X + 0.2, TM_Y - 0.2, teammate.user.first_name, color='blue', fontsize=8)
+
+    if is_detecting:
+        for enemy in enemies:
+            if enemy.has_nhat_nguyet_thao: continue
+            EN_X, EN_Y, _, _ = parse_coordinate_safe(enemy.current_location)
+            ax.plot(EN_X, EN_Y, 'o', color='#FFA500', markersize=8, alpha=0.7)
+
+    X, Y, _, _ = parse_coordinate_safe(current_player_state.current_location)
+    color = 'green' if current_player_state.role == 'Hider' else 'red'
+    ax.plot(X, Y, 'o', color=color, markersize=12, zorder=5, markeredgecolor='black')
+    ax.text(X + 0.2, Y - 0.2, current_player_state.current_location, color=color, weight='bold', zorder=6)
+
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    plt.close(fig)
+    return base64.b64encode(buf.getbuffer()).decode("ascii")
+
+
+def cached_game_map_plot(current_player_state, teammates, enemies, is_detecting, beast_locations=None):
+    # What /game_map.png renders, base64 encoded like the baseline.
+    beast_squares = visible_beast_squares(current_player_state, beast_locations)
+    markers = build_game_map_markers(current_player_state, teammates, enemies, is_detecting)
+    return base64.b64encode(render_game_map_png(beast_squares, markers)).decode("ascii")
+
+
+def make_player(user_id, name, location, role='Seeker', team='TeamA'):
+    return SimpleNamespace(user_id=user_id, user=SimpleNamespace(first_name=name), current_location=location,
+                           role=role, team=team, has_ly_sau_thao=True, has_nhat_nguyet_thao=False)
+
+
+def decode(data):
+    return mpimg.imread(io.BytesIO(base64.b64decode(data)), format='png')
+
+
+def bench(fn, args, seconds=3.0):
+    fn(*args)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn(*args)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    me = make_player(1, 'Minh', '3d5')
+    teammates = [me, make_player(2, 'Lan', '1c3'), make_player(3, 'Huy', '2f8')]
+    enemies = [make_player(4, 'Khoa', '4g2', team='TeamB'), make_player(5, 'Vy', '1h6', team='TeamB')]
+    args = (me, teammates, enemies, True, ['c6', 'h4'])
+
+    old = decode(legacy_generate_game_map_plot(*args))
+    new = decode(cached_game_map_plot(*args))
+    print(f"image size  legacy={old.shape[1]}x{old.shape[0]}  cached={new.shape[1]}x{new.shape[0]}")
+    if old.shape == new.shape:
+        print(f"mean abs pixel difference: {np.abs(old - new).mean():.5f}")
+
+    old_rate = bench(legacy_generate_game_map_plot, args)
+    new_rate = bench(cached_game_map_plot, args)
+    print(f"legacy pyplot : {old_rate:7.1f} renders/s")
+    print(f"cached layer  : {new_rate:7.1f} renders/s  ({new_rate / old_rate:.1f}x)")
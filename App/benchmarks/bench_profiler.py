@@ -0,0 +1,78 @@
+"""Request time with the profiler off and on, and what it reports.
+
+Seeds a throwaway database with one room, then repeats a dashboard GET, the map PNG, a search
+and a move back and forth, with PROFILER_ENABLED off and on. Prints the average request time of each
+run and the profiler's per endpoint and action totals.
+
+Run from the App folder:
+    python benchmarks/bench_profiler.py
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website import create_app, db
+from website.models import User, GameRoom, PlayerState
+
+
+ROUNDS = 50
+REQUESTS = (
+    ('get', '/game_dashboard', {}),
+    ('get', '/game_map.png', {}),
+    ('post', '/game_dashboard', {'data': {'action': 'search'}}),
+    ('post', '/game_dashboard', {'data': {'action': 'move', 'new_location': '3d6'}}),
+    ('post', '/game_dashboard', {'data': {'action': 'move', 'new_location': '3d5'}}),
+)
+
+
+def seed():
+    users = [User(email=f"p{i}@x.com", first_name=f"Player {i}", password='x', score=0) for i in range(4)]
+    db.session.add_all(users)
+    db.session.flush()
+    room = GameRoom(room_name='Bench', host_id=users[0].id, beast_square_1='c6', beast_square_2='h4')
+    db.session.add(room)
+    db.session.flush()
+    db.session.add_all([
+        PlayerState(user_id=users[0].id, room_id=room.id, team='TeamA', role='Seeker', current_location='3d5',
+                    spirit_class='Dragon', search_turns_left=ROUNDS * 2, current_water=10000.0),
+        PlayerState(user_id=users[1].id, room_id=room.id, team='TeamA', role='Hider', current_location='1c3'),
+        PlayerState(user_id=users[2].id, room_id=room.id, team='TeamB', role='Seeker', current_location='2f8', spirit_class='Tiger'),
+        PlayerState(user_id=users[3].id, room_id=room.id, team='TeamB', role='Hider', current_location='4g6'),
+    ])
+    db.session.commit()
+    return users[0].id
+
+
+def run(enabled):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True,
+                      'SCHEDULER_ENABLED': False, 'PROFILER_ENABLED': enabled})
+    with app.app_context():
+        db.create_all()
+        user_id = seed()
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    # Warm up: the travel matrix and the map background are built on first use.
+    for method, url, kwargs in REQUESTS:
+        getattr(client, method)(url, **kwargs)
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        for method, url, kwargs in REQUESTS:
+            getattr(client, method)(url, **kwargs)
+    elapsed = time.perf_counter() - started
+    return elapsed / (ROUNDS * len(REQUESTS)) * 1000, client.get('/api/profiler_stats').get_json()
+
+
+if __name__ == '__main__':
+    for enabled in (False, True):
+        ms, stats = run(enabled)
+        print(f"profiler {'on ' if enabled else 'off'}  {ms:.2f} ms/request")
+    print(json.dumps(stats['endpoints'], indent=2))
@@ -0,0 +1,62 @@
+"""Worker startup: create_app() time and RSS, and what the first map or move request adds.
+
+Every sample runs in a fresh interpreter, like a new worker process. With --eager the
+plotting stack and the travel matrix are loaded right after create_app(), the way every
+worker paid for them before they were imported lazily.
+
+Run from the App folder:
+    python benchmarks/bench_startup.py [samples] [--eager]
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SAMPLE = r"""
+import sys, json, time, resource
+sys.path.insert(0, %(app_dir)r)
+start = time.perf_counter()
+from website import create_app
+app = create_app({'SCHEDULER_ENABLED': False})
+if %(eager)r:
+    import website.map_render
+    from website.travel_matrix import travel_matrix
+    travel_matrix.ensure_loaded()
+ready = time.perf_counter()
+loaded = {name: name in sys.modules for name in ('matplotlib', 'numpy')}
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from website.views import get_travel_matrix
+from website.map_render import render_game_map_png
+with app.app_context():
+    first = time.perf_counter()
+    get_travel_matrix().get_water_cost('3d5', '4j10')
+    render_game_map_png([], [])
+    first_use = time.perf_counter() - first
+
+print(json.dumps({'startup': ready - start, 'rss': rss, 'first_use': first_use, **loaded}))
+"""
+
+
+def sample(eager):
+    code = SAMPLE % {'app_dir': APP_DIR, 'eager': eager}
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=APP_DIR)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    samples = int(args[0]) if args else 5
+    modes = [True] if '--eager' in sys.argv else [False, True]
+
+    print(f"{'mode':8} {'import+create_app':>18} {'max RSS':>9} {'first map+move':>15}   loaded at startup")
+    for eager in modes:
+        runs = [sample(eager) for _ in range(samples)]
+        startup = statistics.median(run['startup'] for run in runs) * 1000
+        rss = statistics.median(run['rss'] for run in runs)
+        first_use = statistics.median(run['first_use'] for run in runs) * 1000
+        loaded = ', '.join(name for name in ('matplotlib', 'numpy') if runs[0][name]) or 'neither'
+        print(f"{'eager' if eager else 'lazy':8} {startup:15.0f} ms {rss:6.0f} MB {first_use:12.0f} ms   {loaded}")
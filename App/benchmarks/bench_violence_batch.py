@@ -0,0 +1,40 @@
+"""Violence detection: one violence_detector_main call per triple vs batch_violence_detector.
+
+Checks that both give the same answer for every triple, then times them.
+
+Run from the App folder:
+    python benchmarks/bench_violence_batch.py [moves] [observers]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website.travel_matrix import batch_violence_detector, SQUARE_CODES
+from website.views import violence_detector_main
+
+
+if __name__ == '__main__':
+    move_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    observer_count = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    random.seed(0)
+    moves = [(random.choice(SQUARE_CODES), random.choice(SQUARE_CODES)) for _ in range(move_count)]
+    observers = random.sample(SQUARE_CODES, observer_count)
+    triples = move_count * observer_count
+
+    start = time.perf_counter()
+    scalar = [[violence_detector_main(l, k, m)['result'] == "Violence occurs" for m in observers] for l, k in moves]
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = batch_violence_detector(moves, observers)
+    new = time.perf_counter() - start
+
+    mismatches = int((batch != scalar).sum())
+    print(f"{triples} triples ({move_count} moves x {observer_count} observers), {mismatches} mismatches")
+    print(f"scalar : {triples / old / 1e3:9.1f} k triples/s")
+    print(f"batch  : {triples / new / 1e3:9.1f} k triples/s  ({old / new:.1f}x)")
+    sys.exit(1 if mismatches else 0)
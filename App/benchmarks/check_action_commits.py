@@ -0,0 +1,118 @@
+"""Commits per POST /game_dashboard action.
+
+Seeds a fresh room for every scenario in a throwaway database, posts one action and
+counts the COMMITs SQLite receives. Every action, including the ones that eliminate the
+player or end the room, should commit exactly once; exits with 1 if any does not.
+
+Run from the App folder:
+    python benchmarks/check_action_commits.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sqlalchemy import event
+
+from website import create_app, db
+from website.models import User, GameRoom, PlayerState
+from website.travel_matrix import travel_matrix
+
+
+def seed(name, actor=None, ally=None, enemy=None, enemy_hider=None, violence=False):
+    """A room with a Seeker (the actor), their Hider, an enemy Seeker and an enemy Hider."""
+    users = [User(email=f"{name}{i}@x.com", first_name=f"{name} {i}", password='x', score=0) for i in range(4)]
+    db.session.add_all(users)
+    db.session.flush()
+    room = GameRoom(room_name=name, host_id=users[0].id, beast_square_1='c6', beast_square_2='h4', violence_enabled=violence)
+    db.session.add(room)
+    db.session.flush()
+    rows = (
+        (users[0], dict(team='TeamA', role='Seeker', current_location='3d5', spirit_class='Dragon'), actor),
+        (users[1], dict(team='TeamA', role='Hider', current_location='1c3'), ally),
+        (users[2], dict(team='TeamB', role='Seeker', current_location='2f8', spirit_class='Tiger'), enemy),
+        (users[3], dict(team='TeamB', role='Hider', current_location='4g6'), enemy_hider),
+    )
+    now = datetime.now(timezone.utc)
+    for user, values, overrides in rows:
+        values = dict(last_action_time=now, last_active_post_time=now, **values)
+        values.update(overrides or {})
+        db.session.add(PlayerState(user_id=user.id, room_id=room.id, **values))
+    db.session.commit()
+    return users
+
+
+def water_for(from_square, to_square, spare):
+    travel_matrix.ensure_loaded()
+    return travel_matrix.get_water_cost(from_square, to_square) + spare
+
+
+def scenarios():
+    """(label, seed kwargs, index of the acting user, form). Seeds run lazily inside the app context."""
+    hours_ago = datetime.now(timezone.utc) - timedelta(hours=13)
+    return [
+        ('move', {}, 0, {'action': 'move', 'new_location': '3d6'}),
+        ('move + duel', dict(enemy={'current_location': '1d6'}, violence=True), 0, {'action': 'move', 'new_location': '2d6'}),
+        ('move, no water', dict(actor={'current_water': 0.05}), 0, {'action': 'move', 'new_location': '2f8'}),
+        ('move into trap', dict(actor={'current_water': lambda: water_for('3d5', '3d6', 1.0)},
+                                enemy={'active_trap_location': '3d6', 'active_trap_time': datetime.now(timezone.utc)}),
+         0, {'action': 'move', 'new_location': '3d6'}),
+        ('search', {}, 0, {'action': 'search'}),
+        ('search, found', dict(enemy_hider={'current_location': '3d5'}), 0, {'action': 'search'}),
+        ('detect', {}, 0, {'action': 'detect'}),
+        ('gather', {}, 0, {'action': 'gather'}),
+        ('take_water', dict(actor={'current_water': 5.0}), 0, {'action': 'take_water'}),
+        ('purify_water', dict(actor={'has_seawater_purifier': True, 'current_location': '2b3'}), 0, {'action': 'purify_water'}),
+        ('set_trap', dict(actor={'has_u_tam_thao': True}), 0, {'action': 'set_trap', 'trap_coordinate': '2e5'}),
+        ('disclose_trace', dict(actor={'has_phan_thien_thao': True}), 0, {'action': 'disclose_trace', 'target_id': 'enemy'}),
+        ('transfer_water', dict(ally={'role': 'Seeker', 'current_location': '3d5'}), 0,
+         {'action': 'transfer_water', 'receiver_id': 'ally', 'amount': '1'}),
+        ('teleport', dict(actor={'has_teleport': True}), 0, {'action': 'teleport', 'teleport_location': '2e5'}),
+        ('track', dict(actor={'last_active_post_time': hours_ago}), 0, {'action': 'track'}),
+        ('emit_signal', {}, 1, {'action': 'emit_signal'}),
+        ('surrender', {}, 1, {'action': 'surrender'}),
+        ('restore', {}, 0, {'action': 'restore'}),
+        ('restore, gamemaster', dict(actor={'role': 'Gamemaster'}), 0, {'action': 'restore'}),
+        ('stunned', dict(actor={'stun_expires_at': datetime.now(timezone.utc) + timedelta(hours=1)}), 0, {'action': 'search'}),
+        ('hider dry, new hider', dict(ally={'current_water': 0.0}), 1, {'action': 'emit_signal'}),
+        ('hider dry, game over', dict(actor={'game_status': 'Eliminated (Trap)'}, ally={'current_water': 0.0}), 1, {'action': 'emit_signal'}),
+    ]
+
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True, 'SCHEDULER_ENABLED': False})
+    commits = [0]
+    with app.app_context():
+        db.create_all()
+        event.listen(db.engine, 'commit', lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+    failed = []
+    for i, (label, kwargs, actor_index, form) in enumerate(scenarios()):
+        with app.app_context():
+            for key in ('actor', 'ally', 'enemy', 'enemy_hider'):
+                overrides = kwargs.get(key) or {}
+                for field, value in list(overrides.items()):
+                    if callable(value):
+                        overrides[field] = value()
+            users = seed(f"s{i}", **kwargs)
+            ids = {'ally': users[1].id, 'enemy': users[2].id}
+            form = {key: str(ids.get(value, value)) for key, value in form.items()}
+            user_id = users[actor_index].id
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        commits[0] = 0
+        response = client.post('/game_dashboard', data=form)
+        ok = response.status_code == 302 and commits[0] == 1
+        print(f"{label:22} {commits[0]} commit(s)  -> {response.headers.get('Location')}{'' if ok else '   <-- FAIL'}")
+        if not ok:
+            failed.append(label)
+
+    if failed:
+        print(f"More or less than one commit: {', '.join(failed)}")
+        sys.exit(1)
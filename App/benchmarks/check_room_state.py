@@ -0,0 +1,74 @@
+"""Players joining a room the room state engine already holds.
+
+With ROOM_STATE_ENGINE on, a player of a seeded room loads the dashboard so the room is
+cached, then a second user joins it through /game_lobby. The newcomer must be able to load
+/api/game_map and the dashboard, and the cached roster must list them; exits with 1 if not.
+
+Run from the App folder:
+    python benchmarks/check_room_state.py
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website import create_app, db
+from website.models import User, GameRoom, PlayerState
+from website.room_state import room_state
+
+
+def seed():
+    users = [User(email=f"room{i}@x.com", first_name=f"Room {i}", password='x', score=0) for i in range(2)]
+    db.session.add_all(users)
+    db.session.flush()
+    room = GameRoom(room_name='cached', host_id=users[0].id, beast_square_1='c6', beast_square_2='h4')
+    db.session.add(room)
+    db.session.flush()
+    now = datetime.now(timezone.utc)
+    db.session.add(PlayerState(user_id=users[0].id, room_id=room.id, team='TeamA', role='Seeker',
+                               current_location='3d5', spirit_class='Dragon',
+                               last_action_time=now, last_active_post_time=now))
+    db.session.commit()
+    return room.id, users[0].id, users[1].id
+
+
+def client_for(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True,
+                      'SCHEDULER_ENABLED': False, 'ROOM_STATE_ENGINE': True})
+    with app.app_context():
+        db.create_all()
+        room_id, host_id, joiner_id = seed()
+
+    host = client_for(app, host_id)
+    joiner = client_for(app, joiner_id)
+    checks = []
+
+    checks.append(('host dashboard', host.get('/game_dashboard').status_code == 200))
+    with app.app_context():
+        checks.append(('room cached', room_state.get_room(room_id) is not None))
+
+    response = joiner.post(f'/game_lobby?room_id={room_id}',
+                           data={'team': 'TeamB', 'role': 'Hider', 'start_location': '4g6'})
+    checks.append(('join', response.status_code == 302))
+    checks.append(('newcomer map', joiner.get('/api/game_map').status_code == 200))
+    checks.append(('newcomer dashboard', joiner.get('/game_dashboard').status_code == 200))
+    with app.app_context():
+        checks.append(('cached roster', joiner_id in {p.user_id for p in room_state.players(room_id)}))
+
+    for label, ok in checks:
+        print(f"{label:20} {'ok' if ok else 'FAIL'}")
+    failed = [label for label, ok in checks if not ok]
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+        sys.exit(1)
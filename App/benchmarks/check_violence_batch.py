@@ -0,0 +1,59 @@
+"""Malformed payloads on POST /api/violence_detector/batch.
+
+Posts well-formed and malformed batches as a logged-in user in a throwaway database.
+Malformed ones (wrong shapes, codes that are not strings, unknown codes) must get a 400
+and never a 500; exits with 1 if any does not get the expected status.
+
+Run from the App folder:
+    python benchmarks/check_violence_batch.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from website import create_app, db
+from website.models import User
+
+
+PAYLOADS = [
+    ('valid', {'moves': [['3d5', '3d6']], 'observers': ['2e5']}, 200),
+    ('empty body', None, 400),
+    ('moves not a list', {'moves': '3d5', 'observers': ['2e5']}, 400),
+    ('move of one code', {'moves': [['3d5']], 'observers': ['2e5']}, 400),
+    ('move not a list', {'moves': ['3d5'], 'observers': ['2e5']}, 400),
+    ('number in move', {'moves': [[1, 'a1']], 'observers': ['2e5']}, 400),
+    ('list in move', {'moves': [[['3d5'], '3d6']], 'observers': ['2e5']}, 400),
+    ('list observer', {'moves': [['3d5', '3d6']], 'observers': [[1]]}, 400),
+    ('dict observer', {'moves': [['3d5', '3d6']], 'observers': [{'a': 1}]}, 400),
+    ('unknown code', {'moves': [['3d5', 'zz']], 'observers': ['2e5']}, 400),
+]
+
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True, 'SCHEDULER_ENABLED': False})
+    with app.app_context():
+        db.create_all()
+        user = User(email='batch@x.com', first_name='Batch', password='x', score=0)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    failed = []
+    for label, payload, expected in PAYLOADS:
+        response = client.post('/api/violence_detector/batch', json=payload)
+        ok = response.status_code == expected
+        print(f"{label:18} {response.status_code}{'' if ok else f'   <-- FAIL, expected {expected}'}")
+        if not ok:
+            failed.append(label)
+
+    if failed:
+        print(f"Unexpected status: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,129 @@
+"""store typed game events
+
+Revision ID: bfc7a4f46a2b
+Revises: f7e7c4d14f8a
+Create Date: 2026-10-18 02:32:23.717529
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bfc7a4f46a2b'
+down_revision = 'f7e7c4d14f8a'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of website/game_events.py at this revision: downgrade must not depend on app
+# code that later revisions change or remove.
+HERB_NAMES = {
+    'tuong_tu': 'Tương tư đoạn trường thảo',
+    'thuong_quan': 'Thượng quan tử uyển thảo',
+    'quynh_tam': 'Quỳnh tâm hoán mệnh thảo',
+    'ly_sau': 'Ly sầu tán phách thảo',
+    'nhat_nguyet': 'Nhật nguyệt tinh luân thảo',
+    'tram_tuong': 'Trầm tương vọng nguyệt thảo',
+    'hai_tam': 'Hải tâm thanh tịnh thảo',
+    'u_tam': 'U tâm tịch diệt thảo',
+    'phan_thien': 'Phần Thiên Truy Long Thảo'
+}
+
+# Rooms always hold exactly these two teams.
+ENEMY_TEAM = {'TeamA': 'TeamB', 'TeamB': 'TeamA'}
+
+# (kind, detail) -> template. (kind, None) is used when the detail has no template of its own.
+EVENT_TEMPLATES = {
+    ('move', None): "Seeker '{actor}' ({team}) moved from '{from_square}' to '{square}'.",
+    ('teleport', None): "Seeker named '{actor}' ({team}) did teleport from '{from_square}' to '{square}' (Item consumed).",
+    ('search', None): "Seeker {actor} searched {square} but found nothing.",
+
+    ('gather', None): "Seeker '{actor}' ({team}) gathered '{herb}' successfully.",
+    ('gather', 'hai_tam'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'u_tam'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'phan_thien'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'tram_tuong'): "Seeker '{actor}' ({team}) gathered '{herb}' in '{square}'.",
+    ('gather', 'nhat_nguyet'): "Seeker '{actor}' ({team}) gathered '{herb}' and is now IMMUNE to Detect.",
+    ('gather', 'nhat_nguyet_void'): "Seeker '{actor}' ({team}) gathered 'Nhật nguyệt tinh luân thảo', but it had no effect as the Hider was already tracked by all enemies.",
+    ('gather', 'tram_tuong_none'): "Seeker '{actor}' ({team}) gathered in '{square}' but found nothing.",
+    ('gather', 'nothing'): "Seeker '{actor}' ({team}) gathered at '{square}' but found nothing.",
+
+    ('trap', 'set'): "Seeker '{actor}' ({team}) set a deadly trap ('U tâm tịch diệt thảo') in somewhere on island. Be careful!",
+    ('trap', 'sprung'): "Seeker '{actor}' ({team}) have fallen into the trap of '{target}' in '{square}' and lose {amount} water bars!",
+
+    ('combat', 'majority_win'): "Combat in '{square}': {team} (The majority) defeated {enemy_team}.",
+    ('combat', 'majority_loss'): "Combat in '{square}': {team} is dominated by {enemy_team}.",
+    ('combat', 'duel_win'): "Duel in '{square}': {actor} defeated {target}.",
+    ('combat', 'duel_loss'): "Duel in '{square}': {actor} is defeated by {target}.",
+    ('combat', 'duel_draw'): "Duel in '{square}': {actor} and {target} draw.",
+    ('combat', 'beast'): "Seeker named '{actor}' in ({team}) encountered a wild beast! His current position is {square}.",
+
+    ('transfer', 'local'): "Seeker '{actor}' (LOCAL) transfered {amount} water to '{target}'.",
+    ('transfer', 'remote'): "Seeker '{actor}' (REMOTE (Item consumed)) transfered {amount} water to '{target}'.",
+
+    ('elimination', 'thirst'): "Seeker named '{actor}' ({team}) is terminated due to running out of water while trying to move to '{square}'.",
+    ('elimination', 'thirst_hider'): "Hider named '{actor}' ({team}) ran out of water and was eliminated.",
+    ('elimination', 'trap'): "Seeker '{actor}' ({team}) is terminated due to step into a trap.",
+    ('elimination', 'beast'): "Seeker named '{actor}' ({team}) was eliminated by a beast while trying to move to '{square}'."
+}
+
+
+def describe(kind, detail, team_id, square, from_square, amount, log_message, actor_name, target_name):
+    template = EVENT_TEMPLATES.get((kind, detail)) or EVENT_TEMPLATES.get((kind, None))
+    if template is None:
+        return log_message or f"{kind} ({detail})"
+    return template.format(
+        actor=actor_name if actor_name is not None else 'Unknown',
+        target=target_name if target_name is not None else 'Unknown',
+        team=team_id,
+        enemy_team=ENEMY_TEAM.get(team_id, 'the enemy'),
+        square=square,
+        from_square=from_square,
+        amount=amount,
+        herb=HERB_NAMES.get(detail, detail)
+    )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('game_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.Enum('move', 'search', 'gather', 'trap', 'combat', 'transfer', 'teleport', 'elimination', name='game_event_kind', native_enum=False), nullable=True))
+        batch_op.add_column(sa.Column('detail', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('target_user_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('square', sa.String(length=5), nullable=True))
+        batch_op.add_column(sa.Column('from_square', sa.String(length=5), nullable=True))
+        batch_op.add_column(sa.Column('amount', sa.Float(), nullable=True))
+        batch_op.create_index('ix_game_log_room_id_kind_timestamp', ['room_id', 'kind', 'timestamp'], unique=False)
+        batch_op.create_foreign_key(batch_op.f('fk_game_log_target_user_id_user'), 'user', ['target_user_id'], ['id'])
+
+    # ### end Alembic commands ###
+
+
+def downgrade():
+    # Typed rows keep no text of their own; write the sentence the feed showed into log_message
+    # before the columns it is built from go away.
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT game_log.id, kind, detail, team_id, square, from_square, amount, log_message, "
+        "actor.first_name, target.first_name FROM game_log "
+        "LEFT JOIN \"user\" AS actor ON actor.id = game_log.user_id "
+        "LEFT JOIN \"user\" AS target ON target.id = game_log.target_user_id "
+        "WHERE kind IS NOT NULL"
+    )).all()
+    for log_id, *values in rows:
+        conn.execute(sa.text("UPDATE game_log SET log_message = :message WHERE id = :log_id"),
+                     {'message': describe(*values), 'log_id': log_id})
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('game_log', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_game_log_target_user_id_user'), type_='foreignkey')
+        batch_op.drop_index('ix_game_log_room_id_kind_timestamp')
+        batch_op.drop_column('amount')
+        batch_op.drop_column('from_square')
+        batch_op.drop_column('square')
+        batch_op.drop_column('target_user_id')
+        batch_op.drop_column('detail')
+        batch_op.drop_column('kind')
+
+    # ### end Alembic commands ###
@@ -20,7 +20,7 @@ migrate = Migrate()
 DB_NAME = "database.db"
 
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'iuChut'
 
@@ -29,11 +29,62 @@ def create_app():
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static/avatars')
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     app.config['PAGE_PROTECT_PASSWORD'] = '2005'
+    app.config['PLOT_CACHE_SIZE'] = 512
+    app.config['GAME_MAP_MODE'] = 'svg'   # 'svg': browser draws the map from /api/game_map, 'png': server renders /game_map.png
+    app.config['PLOT_CACHE_DIR'] = None   # e.g. os.path.join(app.root_path, 'plot_cache') to keep plots between restarts
+    app.config['MAP_TILE_DIR'] = None   # e.g. os.path.join(app.root_path, 'map_tiles') to share room map backgrounds between processes
+    app.config['RENDER_WORKERS'] = 0   # processes rendering /game_map.png, 0 = render in the request thread
+    app.config['RENDER_TIMEOUT_SECONDS'] = 2   # how long a request waits for its map before showing the previous one
+    app.config['RENDER_FIRST_TIMEOUT_SECONDS'] = 10   # how long a player with no previous map waits before getting a 503
+    app.config['ACTIVITY_STREAM_HEARTBEAT'] = 15   # seconds between keep-alive comments on /api/activity_stream
+    app.config['ACTIVITY_STREAM_LIFETIME'] = 300   # seconds before a stream closes and the browser reconnects
+    app.config['TRAVEL_MATRIX_DIR'] = None   # folder for the cached travel_matrix_v*.npy, None = build in memory
+    app.config['ROOM_STATE_ENGINE'] = False   # keep active rooms in memory; only for a single worker process
+    app.config['QUERY_COUNT_HEADER'] = False   # add X-Query-Count (SQL statements run) to every response
+    app.config['PROFILER_ENABLED'] = False   # time SQL, map renders and commits per endpoint and action, see /api/profiler_stats
+    app.config['PROFILER_LOG'] = False   # with the profiler on, print one JSON line per request
+    app.config['PROFILER_SLOW_QUERY_MS'] = 100   # statements slower than this are listed in /api/profiler_stats
+    app.config['THIRST_SWEEP_SECONDS'] = 60   # how often players who never reload are checked for running dry, 0 = off
+    app.config['DAILY_TRANSITIONS_SECONDS'] = 30   # how often herb spawns, Trầm Tương rolls and daily resets are checked, 0 = off
+    app.config['SCHEDULER_ENABLED'] = True   # run the jobs above in a thread of this process; False when 'flask run-scheduler' runs them
+    app.config['LOG_BUFFER'] = True   # write a request's log rows with one executemany at its commit instead of one INSERT each
+    app.config['ASYNC_LOG_WRITER'] = False   # write logs no page reads back (joins, violence toggles) from a background thread
+
+    if config:
+        app.config.update(config)
 
 
     db.init_app(app)
     migrate.init_app(app, db, render_as_batch=True)
 
+    from .plot_cache import plot_cache
+    plot_cache.configure(max_entries=app.config['PLOT_CACHE_SIZE'], cache_dir=app.config['PLOT_CACHE_DIR'])
+
+    from .map_cache import map_tiles
+    map_tiles.configure(cache_dir=app.config['MAP_TILE_DIR'])
+
+    from .render_pool import render_pool
+    render_pool.configure(workers=app.config['RENDER_WORKERS'], timeout=app.config['RENDER_TIMEOUT_SECONDS'],
+                          first_timeout=app.config['RENDER_FIRST_TIMEOUT_SECONDS'])
+
+    from .activity_feed import init_activity_feed
+    init_activity_feed(app)
+
+    from .log_buffer import init_log_buffer
+    init_log_buffer(app)
+
+    from .herbs import init_herbs
+    init_herbs(app)
+
+    from .room_state import init_room_state
+    init_room_state(app)
+
+    from .query_counter import init_query_counter
+    init_query_counter(app)
+
+    from .scheduler import init_scheduler
+    init_scheduler(app)
+
     from .views import views
     from .auth import auth
 
@@ -0,0 +1,167 @@
+import threading
+from datetime import timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+
+from . import db
+from .models import GameLog, GameChat
+from .game_events import describe
+
+
+FEED_LIMIT = 20
+VIETNAM_TZ_OFFSET = timedelta(hours=7)
+# Rows are stamped at insert, so a row newer than the cursor can only be older than the cursor
+# row by a write-lock wait. The window keeps cursor polls on a short index range.
+CURSOR_TIMESTAMP_SLACK = timedelta(minutes=1)
+
+
+def log_to_dict(log):
+    local_time = log.timestamp + VIETNAM_TZ_OFFSET
+    return {'id': log.id, 'message': describe(log), 'timestamp': local_time.strftime('%d/%m %H:%M:%S')}
+
+
+def chat_to_dict(msg, user_id):
+    local_time = msg.timestamp + VIETNAM_TZ_OFFSET
+    return {
+        'id': msg.id,
+        'user_name': msg.user.first_name,
+        'message': msg.message_body,
+        'timestamp': local_time.strftime('%d/%m %H:%M:%S'),
+        'is_self': msg.user_id == user_id
+    }
+
+
+def feed_streams(state, user_id):
+    """Every stream the player may see, as name -> (model, query). Visibility is decided here only."""
+    room_id = state.room_id
+    chat_query = GameChat.query.options(joinedload(GameChat.user))
+    # Event rows are rendered from their actor and target names, fetched for the page in one go.
+    log_query = GameLog.query.options(selectinload(GameLog.user), selectinload(GameLog.target))
+
+    streams = {
+        'global_logs': (GameLog, log_query.filter(GameLog.room_id == room_id, GameLog.privacy == 'public')),
+        # Global chat is always stored without a team; saying so lets the query use the chat index order.
+        'global_chat': (GameChat, chat_query.filter(
+            GameChat.room_id == room_id, GameChat.scope == 'global', GameChat.team_id.is_(None))),
+    }
+
+    if state.role == 'Gamemaster':
+        for team_id, prefix in (('TeamA', 'team_a'), ('TeamB', 'team_b')):
+            streams[f'{prefix}_logs'] = (GameLog, log_query.filter(
+                GameLog.room_id == room_id, GameLog.team_id == team_id, GameLog.privacy == 'team'))
+            streams[f'{prefix}_chat'] = (GameChat, chat_query.filter(
+                GameChat.room_id == room_id, GameChat.scope == 'team', GameChat.team_id == team_id))
+    else:
+        streams['team_logs'] = (GameLog, log_query.filter(
+            GameLog.room_id == room_id,
+            GameLog.team_id == state.team,
+            (GameLog.privacy == 'team') | (GameLog.user_id == user_id)
+        ))
+        streams['team_chat'] = (GameChat, chat_query.filter(
+            GameChat.room_id == room_id, GameChat.scope == 'team', GameChat.team_id == state.team))
+
+    return streams
+
+
+def load_feed(state, user_id, cursors=None):
+    """Rows newer than each stream's cursor (the last FEED_LIMIT rows if there is no cursor).
+
+    Returns (feed, new_cursors, more). A cursor poll gets at most FEED_LIMIT rows per stream, the
+    oldest ones first, and the cursor stops at the last of them; `more` says a stream has rows left.
+    Logs are newest first and chat oldest first, like the page shows them.
+    """
+    cursors = cursors or {}
+    feed = {}
+    new_cursors = {}
+    more = False
+
+    for name, (model, query) in feed_streams(state, user_id).items():
+        since_id = cursors.get(name)
+        if since_id is not None:
+            query = query.filter(model.id > since_id)
+            since_row = db.session.get(model, since_id)
+            if since_row is not None:
+                query = query.filter(model.timestamp >= since_row.timestamp - CURSOR_TIMESTAMP_SLACK)
+            # Oldest first from the cursor, so a burst bigger than one page is delivered over several.
+            rows = query.order_by(model.id.asc()).limit(FEED_LIMIT).all()
+            rows.reverse()
+            more = more or len(rows) == FEED_LIMIT
+        else:
+            # Timestamp order walks the (room_id, ..., timestamp) indexes backwards with no sort step.
+            rows = query.order_by(model.timestamp.desc(), model.id.desc()).limit(FEED_LIMIT).all()
+
+        new_cursors[name] = max([row.id for row in rows], default=since_id or 0)
+        if model is GameLog:
+            feed[name] = [log_to_dict(row) for row in rows]
+        else:
+            feed[name] = [chat_to_dict(row, user_id) for row in reversed(rows)]
+
+    return feed, new_cursors, more
+
+
+def parse_cursors(raw):
+    """Cursors travel as 'name:id,name:id'; anything malformed is ignored."""
+    cursors = {}
+    for part in (raw or '').split(','):
+        name, _, value = part.partition(':')
+        if name and value.isdigit():
+            cursors[name] = int(value)
+    return cursors
+
+
+def format_cursors(cursors):
+    return ','.join(f"{name}:{value}" for name, value in sorted(cursors.items()))
+
+
+# In-process change signal, so open streams only query when their room actually got a row.
+_room_versions = {}
+_room_condition = threading.Condition()
+
+
+def room_version(room_id):
+    with _room_condition:
+        return _room_versions.get(room_id, 0)
+
+
+def notify_rooms(room_ids):
+    with _room_condition:
+        for room_id in room_ids:
+            _room_versions[room_id] = _room_versions.get(room_id, 0) + 1
+        _room_condition.notify_all()
+
+
+def wait_for_room_change(room_id, version, timeout):
+    """Block until the room's version moves past `version` or timeout; returns the current version."""
+    with _room_condition:
+        _room_condition.wait_for(lambda: _room_versions.get(room_id, 0) != version, timeout)
+        return _room_versions.get(room_id, 0)
+
+
+def _collect_feed_rooms(session, flush_context, instances):
+    rooms = session.info.setdefault('feed_rooms', set())
+    for obj in session.new:
+        if isinstance(obj, (GameLog, GameChat)) and obj.room_id is not None:
+            rooms.add(obj.room_id)
+
+
+def _notify_feed_rooms(session):
+    rooms = session.info.pop('feed_rooms', None)
+    if rooms:
+        notify_rooms(rooms)
+
+
+def _forget_feed_rooms(session):
+    session.info.pop('feed_rooms', None)
+
+
+_hooks_registered = False
+
+
+def init_activity_feed(app):
+    global _hooks_registered
+    if _hooks_registered:
+        return
+    event.listen(db.session, 'before_flush', _collect_feed_rooms)
+    event.listen(db.session, 'after_commit', _notify_feed_rooms)
+    event.listen(db.session, 'after_rollback', _forget_feed_rooms)
+    _hooks_registered = True
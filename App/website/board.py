@@ -0,0 +1,166 @@
+from collections import namedtuple
+
+
+SEAWATER_LOCATIONS = {
+    '1a1', '2a1', '3a1', '4a1', '1b1', '2b1',
+      '3b1', '4b1', '1c1', '2c1', '3c1', '4c1', '1d1', '2d1', '3d1', '4d1',
+      '1e1', '2e1', '1f1', '2f1', '3f1', '1g1', '2g1', '3g1', '4g1', '1h1',
+      '2h1', '3h1', '4h1', '1i1', '2i1', '3i1', '4i1', '1j1', '2j1', '3j1',
+      '4j1', '1a2', '3a2', '4a2', '1b2', '2b2', '3b2', '4b2', '1c2', '2c2',
+      '4c2', '1g2', '2g2', '2h2', '1i2', '2i2', '1j2', '2j2', '3j2', '4j2',
+      '1a3', '3a3', '4a3', '1j3', '2j3', '3j3', '4j3', '1a4', '4a4', '1j4', '2j4',
+      '3j4', '4j4', '1a5', '4a5', '1j5', '2j5', '3j5', '4j5', '1a6', '2a6',
+      '3a6', '4a6', '1j6', '2j6', '3j6', '4j6', '1a7', '2a7', '3a7', '4a7',
+      '1j7', '2j7', '3j7', '4j7', '1a8', '2a8', '3a8', '4a8', '1j8', '2j8',
+      '3j8', '4j8', '1a9', '2a9', '3a9', '4a9', '3b9', '1c9', '2c9', '3c9',
+      '4c9', '4g9', '2j9', '3j9', '1a10', '2a10', '3a10', '4a10', '1b10',
+      '2b10', '3b10', '4b10', '2e10', '3e10', '4e10', '1f10', '2f10', '3f10',
+      '4f10', '1g10', '2g10', '3g10', '4g10', '1h10', '2h10', '3h10', '4h10',
+      '3i10', '4i10', '2j10', '3j10', '4j10'
+}
+
+FRESH_WATER_LOCATIONS = {
+    '3c3', '4c3', '1c4', '2c4', '3d4', '4d4', '1d5', '2d5', '3d5', '4d5', '1d6', '2d6', '1e6'
+}
+
+JUNGLE_SQUARES = {'c6', 'h4', 'e8', 'i8'}
+
+HERBS_LOCATIONS_POOL = [
+    '1e2', '1h2', '2c3', '4e3', '2g3', '2i3', '1b5', '4b6', '1c6', '4e6', '4f4', '2h4',
+    '2h6', '2i6', '4i6', '2c7', '2e7', '1c8', '2b9', '2d8', '4f8', '2g8', '2i8', '2d9',
+    '1c10', '4h9', '3i9', '2c5', '2b4', '4f2'
+]
+
+
+COLUMNS = 'abcdefghij'
+QUADRANTS = '1234'
+
+# Offset of each quadrant's centre from the bottom-right corner (x, y) of its main square.
+QUADRANT_OFFSETS = {
+    '1': (0.75, 0.75),
+    '2': (0.25, 0.75),
+    '3': (0.25, 0.25),
+    '4': (0.75, 0.25)
+}
+
+# Longest possible trip on the board, from one corner centre to the other.
+D_HARD = ((9.75-0.25)**2 + (9.75-0.25)**2)**(1/2)
+T_HARD = 21600
+
+
+PartialSquare = namedtuple('PartialSquare', [
+    'code', 'X', 'Y', 'x', 'y', 'main_square',
+    'is_seawater', 'is_fresh_water', 'is_herb_spot', 'is_jungle'
+])
+
+
+def _build_main_squares():
+    main_squares = {}
+    for x, col in enumerate(COLUMNS, start=1):
+        for y in range(1, 11):
+            main_squares[f"{col}{y}"] = (x, y)
+    return main_squares
+
+
+def _build_partial_squares():
+    herb_spots = set(HERBS_LOCATIONS_POOL)
+    partial_squares = {}
+    for main_square, (x, y) in MAIN_SQUARES.items():
+        for p in QUADRANTS:
+            code = f"{p}{main_square}"
+            dx, dy = QUADRANT_OFFSETS[p]
+            partial_squares[code] = PartialSquare(
+                code=code,
+                X=x - dx,
+                Y=y - dy,
+                x=x,
+                y=y,
+                main_square=main_square,
+                is_seawater=code in SEAWATER_LOCATIONS,
+                is_fresh_water=code in FRESH_WATER_LOCATIONS,
+                is_herb_spot=code in herb_spots,
+                is_jungle=main_square in JUNGLE_SQUARES
+            )
+    return partial_squares
+
+
+def _build_super_squares():
+    super_squares = {}
+    for main_square, (x, y) in MAIN_SQUARES.items():
+        zone = set()
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                if 1 <= x + dx <= 10 and 1 <= y + dy <= 10:
+                    zone.add(f"{COLUMNS[x + dx - 1]}{y + dy}")
+        super_squares[main_square] = frozenset(zone)
+    return super_squares
+
+
+MAIN_SQUARES = _build_main_squares()
+PARTIAL_SQUARES = _build_partial_squares()
+SUPER_SQUARES = _build_super_squares()
+COASTAL_MAIN_SQUARES = frozenset(sq.main_square for sq in PARTIAL_SQUARES.values() if sq.is_seawater)
+
+
+def get_partial_square(code):
+    """The one validation for partial-square codes like '3g7' or '4j10'; None if invalid."""
+    if not isinstance(code, str):
+        return None
+    return PARTIAL_SQUARES.get(code)
+
+
+def get_main_square(code):
+    """(x, y) of a main square code like 'g7'; None if invalid."""
+    if not isinstance(code, str):
+        return None
+    return MAIN_SQUARES.get(code)
+
+
+def check_if_main_square_is_coastal(main_square):
+    return main_square in COASTAL_MAIN_SQUARES
+
+
+def parse_coordinate_safe(coord_str):
+    square = get_partial_square(coord_str)
+    if square is None:
+        return None
+    return (square.X, square.Y, square.x, square.y)
+
+
+def get_super_square(main_square):
+    return set(SUPER_SQUARES.get(main_square, ()))
+
+
+def segment_hits_square(start, end, x3, y3, X3, Y3):
+    """Whether the move start -> end crosses main square (x3, y3), tested at point (X3, Y3).
+
+    start and end are PartialSquare entries. This is the cross-product test shared by the
+    violence detector (X3, Y3 = observer centre) and beast territory (main square centre).
+    """
+    X1, Y1, x1, y1 = start.X, start.Y, start.x, start.y
+    X2, Y2, x2, y2 = end.X, end.Y, end.x, end.y
+
+    x11, y11 = x3 - 1, y3 - 1
+    x12, y12 = x3,     y3 - 1
+    x21, y21 = x3 - 1, y3
+    x22, y22 = x3,     y3
+
+    a = (Y2 - Y1)*(x11 - X1) - (X2 - X1)*(y11 - Y1)
+    b = (Y2 - Y1)*(x12 - X1) - (X2 - X1)*(y12 - Y1)
+    c = (Y2 - Y1)*(x21 - X1) - (X2 - X1)*(y21 - Y1)
+    d = (Y2 - Y1)*(x22 - X1) - (X2 - X1)*(y22 - Y1)
+    if X1 < X2:
+        X_low_limit = x1 - 1
+        X_high_limit = x2
+    else:
+        X_low_limit = x2 - 1
+        X_high_limit = x1
+    if Y1 > Y2:
+        Y_low_limit = y1
+        Y_high_limit = y2 - 1
+    else:
+        Y_low_limit = y2
+        Y_high_limit = y1 - 1
+    if (a > 0 and b > 0 and c > 0 and d > 0) or (a < 0 and b < 0 and c < 0 and d < 0) or X3 < X_low_limit or X3 > X_high_limit or Y3 > Y_low_limit or Y3 < Y_high_limit:
+        return False
+    return True
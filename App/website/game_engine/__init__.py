@@ -0,0 +1,9 @@
+"""Dashboard actions.
+
+Each action is a handler registered with @action in one of the modules below; handle_action
+loads the player's row with only what the handler declared it needs, runs it and commits once.
+"""
+from .registry import ACTIONS, action, action_stats
+from .pipeline import handle_action
+
+from . import movement, seeker, items, water_actions, hider, room  # noqa: F401  (register the handlers)
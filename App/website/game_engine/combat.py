@@ -0,0 +1,183 @@
+from datetime import datetime, timezone, timedelta
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .. import db
+from ..models import PlayerState
+from .rules import create_game_log, log_event, get_travel_matrix, active_beast_squares, is_lunar_eclipse
+
+
+def apply_penalty(player_state):
+    player_state.current_water = 1.0
+    player_state.last_action_time = datetime.now(timezone.utc)
+    player_state.stun_expires_at = datetime.now(timezone.utc) + timedelta(hours=6)
+
+
+def resolve_spirit_combat(spirit_a, spirit_b):
+    rules = {
+        'Dragon': 'Tiger',
+        'Tiger': 'Bird',
+        'Bird': 'Tortoise',
+        'Tortoise': 'Dragon'
+    }
+
+    if rules.get(spirit_a) == spirit_b:
+        return 'WIN'
+    elif rules.get(spirit_b) == spirit_a:
+        return 'LOSE'
+    else:
+        return 'DRAW'
+
+
+def check_and_trigger_traps(victim_state, current_room_id):
+    enemy_seekers = PlayerState.query.filter(
+        PlayerState.room_id == current_room_id,
+        PlayerState.team != victim_state.team,
+        PlayerState.role == 'Seeker'
+    ).all()
+    hit_trap = False
+    for enemy in enemy_seekers:
+        if enemy.active_trap_location == victim_state.current_location:
+            if enemy.active_trap_time:
+                trap_time = enemy.active_trap_time
+                if trap_time.tzinfo is None:
+                    trap_time = trap_time.replace(tzinfo=timezone.utc)
+                time_diff = datetime.now(timezone.utc) - trap_time
+                if time_diff.total_seconds() < 48 * 3600:
+                    hit_trap = True
+
+                    victim_state.current_water -= 3.0
+
+                    enemy.active_trap_location = None
+                    enemy.active_trap_time = None
+                    db.session.add(enemy)
+
+
+                    log_event(victim_state, 'trap', 'sprung', privacy='public', square=victim_state.current_location,
+                              target=enemy, amount=3.0)
+                else:
+                    enemy.active_trap_location = None
+                    enemy.active_trap_time = None
+                    db.session.add(enemy)
+    return hit_trap
+
+
+def arrival_effects(state, current_loc, new_loc, method):
+    """Side effects of reaching a square: traps, then for walked moves combat and beasts.
+
+    Returns a redirect when the player does not survive them, None otherwise.
+    """
+    if check_and_trigger_traps(state, state.room_id):
+        flash("BOOM! You have stepped into the enemy's trap.! Lose 3.0 water bars.", "error")
+
+        if state.current_water <= 0:
+            if state.has_quynh_tam_thao:
+                state.has_quynh_tam_thao = False
+                state.current_water = 5.0
+                flash("Trap make you run out of water, but 'Quỳnh tâm hoán mệnh thảo' saved you!", "success")
+                create_game_log(state, f"Player '{current_user.first_name}' used Quỳnh tâm hoán mệnh thảo to survive after stepping on a trap.", privacy='public')
+            else:
+                state.current_water = 0
+                state.game_status = "Eliminated (Trap)"
+                log_event(state, 'elimination', 'trap', privacy='public', square=state.current_location)
+                db.session.delete(state)
+                return redirect(url_for('views.game_rooms'))
+
+    if method != 'move':
+        return None
+
+    current_room_id = state.room_id
+    if state.room.violence_enabled:
+        current_main_sq = state.current_location[1:]
+
+        all_players_here = PlayerState.query.filter(
+            PlayerState.room_id == current_room_id,
+            PlayerState.role == 'Seeker',
+            PlayerState.game_status == 'Active'
+        ).all()
+
+        fighters_in_square = []
+        for p in all_players_here:
+            p_main_sq = p.current_location[1:]
+            if p_main_sq == current_main_sq:
+                fighters_in_square.append(p)
+
+        my_team_fighters = [p for p in fighters_in_square if p.team == state.team]
+        enemy_fighters = [p for p in fighters_in_square if p.team != state.team]
+
+        if enemy_fighters:
+
+            if len(my_team_fighters) > len(enemy_fighters):
+                for enemy in enemy_fighters:
+                    apply_penalty(enemy)
+                flash("Combat win! Overwhelming numbers. Enemies are stunned!", "success")
+                log_event(state, 'combat', 'majority_win', privacy='public', square=current_main_sq)
+
+                state.has_teleport = True
+
+            elif len(enemy_fighters) > len(my_team_fighters):
+                for ally in my_team_fighters:
+                    apply_penalty(ally)
+                enemy_fighters[0].has_teleport = True
+                flash("Combat lost! There are too many enemies. You are stunned!", "error")
+                log_event(state, 'combat', 'majority_loss', privacy='public', square=current_main_sq)
+
+            else:
+                enemy = enemy_fighters[0]
+                result = resolve_spirit_combat(state.spirit_class, enemy.spirit_class)
+
+                if result == 'WIN':
+                    apply_penalty(enemy)
+                    state.has_teleport = True
+                    flash(f"You won! Your spirit counters the enemy's spirit.", "success")
+                    log_event(state, 'combat', 'duel_win', privacy='public', square=current_main_sq, target=enemy)
+
+                elif result == 'LOSE':
+                    apply_penalty(state)
+                    enemy.has_teleport = True
+                    flash(f"You lost! Your spirit is countered.", "error")
+                    log_event(state, 'combat', 'duel_loss', privacy='public', square=current_main_sq, target=enemy)
+
+                else:
+                    state.current_water -= 1.0
+                    enemy.current_water -= 1.0
+                    flash("Draw! Two equally matched spirits. Both lost 1.0 water bar.", "info")
+                    log_event(state, 'combat', 'duel_draw', privacy='public', square=current_main_sq, target=enemy)
+
+    beast_locations = active_beast_squares(state.room)
+    if is_lunar_eclipse():
+        flash("LUNAR ECLIPSE! All four forests are infested with beasts. Be careful.!", "error")
+
+    from ..travel_matrix import main_square_mask, MAIN_SQUARE_BITS
+    beast_hit_mask = get_travel_matrix().crossed_main_squares(current_loc, new_loc) & main_square_mask(beast_locations)
+
+    for beast_loc in beast_locations:
+        if beast_loc:
+
+            if beast_hit_mask & MAIN_SQUARE_BITS.get(beast_loc, 0):
+
+
+                state.current_water -= 1.0
+
+
+                flash(f"You ran through a beast's territory! You lost an extra 1.0 water and your position was revealed.", "error")
+
+                log_event(state, 'combat', 'beast', privacy='public', square=new_loc)
+
+                if state.current_water <= 0:
+
+                    if state.has_quynh_tam_thao:
+                        state.has_quynh_tam_thao = False
+                        state.current_water = 2.0
+                        flash("You were attacked by a beast and ran out of water, but 'Quỳnh tâm hoán mệnh thảo' saved you!", "success")
+                        create_game_log(state, f"Player '{current_user.first_name}' ({state.team}) used 'Quỳnh tâm hoán mệnh thảo' to survive after encountering the beast.", privacy='team')
+
+                    else:
+
+                        state.current_water = 0
+                        state.game_status = "Eliminated (Beast)"
+                        log_event(state, 'elimination', 'beast', privacy='public', square=new_loc)
+                        db.session.delete(state)
+                        flash("You ran out of water after encountering a beast and were eliminated!", "error")
+                        return redirect(url_for('views.game_rooms'))
+    return None
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .. import db
+from ..models import PlayerState
+from .rules import create_game_log, end_game_and_cleanup_room
+from .registry import action
+
+
+@action('emit_signal', roles=('Hider',))
+def emit_signal(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    if state.has_used_gambit:
+        flash("You do not have any turn to GAMBIT left.", "error")
+    else:
+
+        state.has_used_gambit = True
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+
+        hider_main_square = state.current_location[1:]
+        log_msg = f"HIDER'S GAMBIT! Hider '{current_user.first_name}' ({state.team}) activated the Hider's GAMBIT. This hider is in '{hider_main_square}'."
+        create_game_log(state, log_msg, privacy='public')
+
+
+        teammate_seekers = PlayerState.query.filter(
+            PlayerState.room_id == current_room_id,
+            PlayerState.team == state.team,
+            PlayerState.role == 'Seeker',
+            PlayerState.game_status == 'Active'
+        ).all()
+
+        buffed_seekers = []
+        for seeker in teammate_seekers:
+            seeker.search_turns_left += 1
+            seeker.gather_turns_left += 1
+            buffed_seekers.append(seeker.user.first_name)
+
+        if buffed_seekers:
+            flash_msg = f"GAMBIT successfully! Your main square is revealed. Teammates: {', '.join(buffed_seekers)} got 1 search turn and 1 gather turn for each."
+            create_game_log(state, f"All seekers ({state.team}) got +1 Search/+1 Gather from Hider's Gambit.", privacy='team')
+        else:
+            flash_msg = "GAMBIT successfully! Your main square is revealed. (There is no teammate left to get this buff)."
+
+        flash(flash_msg, "success")
+
+
+@action('surrender', roles=('Hider',), needs=('room',))
+def surrender(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    log_msg = f"Hider named '{current_user.first_name}' ({state.team}) has resigned. {state.team} LOST!. Room '{state.room.room_name}' is terminated."
+    flash_msg = f"You surrendered. {state.team} loses. Exam over."
+
+    losing_seekers = PlayerState.query.filter(
+        PlayerState.room_id == current_room_id,
+        PlayerState.team == state.team,
+        PlayerState.role == 'Seeker'
+    ).all()
+
+    for seeker_state in losing_seekers:
+        seeker_state.user.score -= 10
+        db.session.add(seeker_state.user)
+
+    end_game_and_cleanup_room(current_room_id, log_msg, flash_msg, commit=False)
+
+    return redirect(url_for('views.game_rooms'))
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from flask import flash
+
+from ..models import PlayerState
+from ..board import SEAWATER_LOCATIONS, FRESH_WATER_LOCATIONS, parse_coordinate_safe
+from ..herbs import pick_herb
+from .rules import log_event
+from .registry import action
+
+
+@action('gather', roles=('Seeker',), needs=('room', 'tram_tuong'))
+def gather(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+    if state.gather_turns_left <= 0:
+        return None
+
+    state.gather_turns_left -= 1
+    state.last_action_time = datetime.now(timezone.utc)
+    state.last_active_post_time = datetime.now(timezone.utc)
+
+    herb_found = pick_herb(current_room_id, state.current_location)
+    if herb_found == 'tuong_tu':
+        state.has_remote_water = True
+        flash("Congratulation! You gathered 'Tương tư đoạn trường thảo' successfully", "success")
+        log_event(state, 'gather', 'tuong_tu', privacy='team', square=state.current_location)
+    elif herb_found == 'thuong_quan':
+        state.has_teleport = True
+        flash("Congratulation! You gathered 'Thượng quan tử uyển thảo' successfully", "success")
+        log_event(state, 'gather', 'thuong_quan', privacy='team', square=state.current_location)
+    elif herb_found == 'quynh_tam':
+        state.has_quynh_tam_thao = True
+        flash("Congratulation! You gathered 'Quỳnh tâm hoán mệnh thảo' successfully.", "success")
+        log_event(state, 'gather', 'quynh_tam', privacy='team', square=state.current_location)
+    elif herb_found == 'ly_sau':
+        state.has_ly_sau_thao = True
+        flash("Congratulation! You gathered 'Ly sầu tán phách thảo' successfully.", "success")
+        log_event(state, 'gather', 'ly_sau', privacy='team', square=state.current_location)
+    elif herb_found == 'nhat_nguyet':
+
+        enemy_seekers = PlayerState.query.filter(
+            PlayerState.room_id == current_room_id,
+            PlayerState.team != state.team,
+            PlayerState.role == 'Seeker'
+        ).all()
+
+        all_enemies_have_tracked = False
+        if enemy_seekers:
+
+            all_enemies_have_tracked = all(seeker.has_tracked for seeker in enemy_seekers)
+
+
+        if all_enemies_have_tracked:
+
+            flash("You gathered 'Nhật nguyệt tinh luân thảo', but all enemy Seekers have already tracked your Hider. The herb provides no effect.", "error")
+            log_event(state, 'gather', 'nhat_nguyet_void', privacy='public', square=state.current_location)
+        else:
+
+            state.has_nhat_nguyet_thao = True
+            flash("Congratulation! You gathered 'Nhật nguyệt tinh luân thảo' successfully. You are now immune with Detect action of all enemies.", "success")
+            log_event(state, 'gather', 'nhat_nguyet', privacy='public', square=state.current_location)
+
+    elif state.current_location == '3g7':
+        if ctx.tram_tuong_spawned:
+            state.detect_turns_left += 1
+
+            flash(f"Congratulation! You gathered 'Trầm tương vọng nguyệt thảo'!", "success")
+            log_event(state, 'gather', 'tram_tuong', square=state.current_location)
+        else:
+            flash(f"You gathered {state.current_location} but found nothing.", "info")
+            log_event(state, 'gather', 'tram_tuong_none', privacy='private', square=state.current_location)
+
+    elif state.current_location == '2a2':
+        if state.gathered_seawater_today:
+            flash("The herbs here have all been picked. Please come back tomorrow.!", "info")
+            log_event(state, 'gather', 'nothing', privacy='private', square=state.current_location)
+
+        else:
+            state.has_seawater_purifier = True
+            state.gathered_seawater_today = True
+
+            flash("Congratulation! You gathered 'Hải tâm thanh tịnh thảo' successfully.", "success")
+            log_event(state, 'gather', 'hai_tam', privacy='team', square=state.current_location)
+
+    elif herb_found == 'u_tam':
+        state.has_u_tam_thao = True
+        flash("Congratulation! You gathered 'U tâm tịch diệt thảo'. You now have ability to Set Trap.", "success")
+        log_event(state, 'gather', 'u_tam', privacy='public', square=state.current_location)
+
+    elif herb_found == 'phan_thien':
+        state.has_phan_thien_thao = True
+        flash("Congratulation! You gathered 'Phần Thiên Truy Long Thảo'.", "success")
+        log_event(state, 'gather', 'phan_thien', privacy='public', square=state.current_location)
+
+    else:
+        flash(f"You gathered the partial square '{state.current_location}'. Nothing is here.", "info")
+        log_event(state, 'gather', 'nothing', square=state.current_location)
+
+
+@action('set_trap', roles=('Seeker',))
+def set_trap(ctx):
+    state = ctx.state
+
+    trap_coord = ctx.form.get('trap_coordinate')
+
+    if not state.has_u_tam_thao:
+        flash("You do not have a 'U tâm tịch diệt thảo'.", "error")
+
+    elif not trap_coord or parse_coordinate_safe(trap_coord) is None or trap_coord in SEAWATER_LOCATIONS:
+        flash("Invalid coordinate or Seawater coordinate.", "error")
+
+
+    elif trap_coord in FRESH_WATER_LOCATIONS:
+        flash("You cannot set trap in a partial square with water.", "error")
+
+    else:
+        state.has_u_tam_thao = False
+        state.active_trap_location = trap_coord
+        state.active_trap_time = datetime.now(timezone.utc)
+
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+
+        flash(f"Set a trap successfully in '{trap_coord}'. It will exist for 48h.", "success")
+        log_event(state, 'trap', 'set', privacy='public')
@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .. import db
+from ..board import SEAWATER_LOCATIONS, parse_coordinate_safe
+from .rules import create_game_log, log_event, record_movement, get_travel_matrix
+from .registry import action
+
+
+@action('move', roles=('Seeker',), needs=('room',))
+def move(ctx):
+    state = ctx.state
+
+    new_loc = ctx.form.get('new_location')
+    current_loc = state.current_location
+
+    if not new_loc or not current_loc:
+        flash("System error. Empty coordinate!", "error")
+    elif new_loc in SEAWATER_LOCATIONS:
+        flash(f"Can't move to '{new_loc}' because it is seawater!", "error")
+    else:
+        travel_matrix = get_travel_matrix()
+        time_cost_seconds = travel_matrix.get_travel_time(current_loc, new_loc)
+
+        if time_cost_seconds is None:
+            flash(f"Can't move: Invalid coordinate", "error")
+        else:
+            time_cost_hours = time_cost_seconds / 3600
+            water_cost = travel_matrix.get_water_cost(current_loc, new_loc)
+
+            if state.current_water - water_cost < 0:
+                if state.has_quynh_tam_thao:
+                    state.has_quynh_tam_thao = False
+                    state.current_water = 2.0
+                    flash("You ran out of water, but 'Quỳnh tâm hoán mệnh thảo' saved you! 2.0 water bars is recoveried.", "success")
+                    create_game_log(state, f"Player '{current_user.first_name}' ({state.team}) used 'Quỳnh tâm hoán mệnh thảo' to revive.", privacy='public')
+
+                    if state.current_water - water_cost < 0:
+
+                        flash("Even with 'Quỳnh tâm hoán mệnh thảo' , your water is not enough for this trip! You are terminated.", "error")
+
+                        log_event(state, 'elimination', 'thirst', privacy='public', square=new_loc)
+                        db.session.delete(state)
+                        return redirect(url_for('views.game_rooms'))
+
+                else:
+                    flash("You don't have enough water to move! You are terminated!", "error")
+                    log_event(state, 'elimination', 'thirst', privacy='public', square=new_loc)
+                    db.session.delete(state)
+                    return redirect(url_for('views.game_rooms'))
+
+            state.current_water -= water_cost
+            state.current_location = new_loc
+            state.last_action_time = datetime.now(timezone.utc)
+            state.last_active_post_time = datetime.now(timezone.utc)
+            state.is_detecting = False
+
+            flash(f"Moved to '{new_loc}'. Spent {time_cost_hours:.1f} hour(s). Cost {water_cost} water bar(s).", "success")
+            log_event(state, 'move', square=new_loc, from_square=current_loc)
+            record_movement(state, current_loc, new_loc, method='move')
+            ctx.arrival = (current_loc, new_loc, 'move')
+
+
+@action('teleport', roles=('Seeker', 'Hider'))
+def teleport(ctx):
+    state = ctx.state
+
+    if not state.has_teleport or state.role != 'Seeker':
+        flash("You do not have the 'Thượng quan tử uyển thảo' item.", "error")
+        return redirect(url_for('views.game_dashboard'))
+
+
+    new_loc = ctx.form.get('teleport_location')
+
+    if not new_loc or parse_coordinate_safe(new_loc) is None:
+        flash("Invalid coordinate format.", "error")
+    elif new_loc in SEAWATER_LOCATIONS:
+        flash(f"Can't teleport to '{new_loc}' because it is seawater!", "error")
+    else:
+
+        current_loc = state.current_location
+        state.current_location = new_loc
+        state.has_teleport = False
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+        state.is_detecting = False
+
+        flash(f"Successfully teleported from {current_loc} to {new_loc}! Item consumed.", "success")
+        log_event(state, 'teleport', square=new_loc, from_square=current_loc)
+        record_movement(state, current_loc, new_loc, method='teleport')
+        ctx.arrival = (current_loc, new_loc, 'teleport')
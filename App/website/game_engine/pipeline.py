@@ -0,0 +1,110 @@
+import time
+from datetime import datetime, timezone, timedelta
+from flask import flash, redirect, url_for
+from sqlalchemy.orm import joinedload
+
+from .. import db
+from ..models import PlayerState
+from ..water import settle_water, CURSE_WINDOW_HOURS
+from ..scheduler import tram_tuong_spawned
+from .rules import resolve_thirst, get_thirst_multiplier
+from .registry import ACTIONS, action_stats
+from .combat import arrival_effects
+
+
+class ActionContext:
+    """What a handler gets: the locked player row, the posted form and what it asked for."""
+
+    def __init__(self, state, form, now, tram_tuong_spawned=False):
+        self.state = state
+        self.form = form
+        self.now = now
+        self.tram_tuong_spawned = tram_tuong_spawned
+        self.last_active_time = state.last_active_post_time
+        if self.last_active_time.tzinfo is None:
+            self.last_active_time = self.last_active_time.replace(tzinfo=timezone.utc)
+        # (from_square, to_square, method) once the player has reached a new square.
+        self.arrival = None
+
+
+def load_actor(user_id, needs):
+    query = PlayerState.query
+    if 'room' in needs or 'tram_tuong' in needs:
+        query = query.options(joinedload(PlayerState.room))
+    if 'user' in needs:
+        query = query.options(joinedload(PlayerState.user))
+    return query.with_for_update().filter_by(user_id=user_id).first()
+
+
+def handle_action(user_id, form):
+    """POST /game_dashboard: decay, stun check, action and side effects, then persist.
+
+    The phases never commit, so an action costs one commit (one fsync on SQLite) whatever
+    it sets off. Phases that end the player's or the room's game return their redirect
+    early and persist still runs. Nothing here builds the room snapshot or renders the map;
+    the redirect back to the dashboard does that.
+    """
+    name = form.get('action')
+    handler = ACTIONS.get(name)
+    started = time.perf_counter()
+
+    state = load_actor(user_id, handler.needs if handler else ())
+    if not state:
+        flash("Please select your team and your role first!", "error")
+        return redirect(url_for('views.game_rooms'))
+
+    response = run_phases(state, handler, form)
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        flash(f"An error occurred on commit: {e}", "error")
+        return redirect(url_for('views.game_dashboard'))
+
+    if handler:
+        action_stats.record(name, time.perf_counter() - started)
+    return response or redirect(url_for('views.game_dashboard'))
+
+
+def run_phases(state, handler, form):
+    now_utc = datetime.now(timezone.utc)
+    needs = handler.needs if handler else ()
+    ctx = ActionContext(state, form, now_utc, 'tram_tuong' in needs and tram_tuong_spawned(state.room, now_utc))
+
+    if state.role != 'Gamemaster':
+        now_vietnam = now_utc + timedelta(hours=7)
+        is_window_active = (CURSE_WINDOW_HOURS[0] <= now_vietnam.hour < CURSE_WINDOW_HOURS[1])
+        if get_thirst_multiplier(state, ctx.last_active_time, is_window_active) > 1.0:
+            flash("You do not feel so good in this location. Be careful!", "info")
+
+        # Decay: whatever the action does is applied to the water left at this moment.
+        if state.water_now <= 0:
+            still_playing, message, category = resolve_thirst(state, commit=False)
+            if message:
+                flash(message, category)
+            if not still_playing:
+                return redirect(url_for('views.game_rooms'))
+        settle_water(state)
+
+        # Stun check.
+        if form.get('action') != 'restore' and state.stun_expires_at:
+            stun_time = state.stun_expires_at
+            if stun_time.tzinfo is None:
+                stun_time = stun_time.replace(tzinfo=timezone.utc)
+
+            if stun_time > now_utc:
+                time_left = (stun_time - now_utc).total_seconds() / 3600
+                flash(f"You are stunned due to losing combat! Unable to act for {time_left:.1f}h.", "error")
+                return redirect(url_for('views.game_dashboard'))
+
+    # Action.
+    if not handler or state.role not in handler.roles:
+        return None
+    response = handler.func(ctx)
+    if response is not None:
+        return response
+
+    # Side effects of where the action left the player.
+    if ctx.arrival:
+        return arrival_effects(state, *ctx.arrival)
+    return None
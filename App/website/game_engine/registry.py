@@ -0,0 +1,57 @@
+import threading
+from collections import namedtuple
+
+
+ActionHandler = namedtuple('ActionHandler', ['name', 'func', 'roles', 'needs'])
+
+# action name -> ActionHandler; filled by the @action decorators of the handler modules.
+ACTIONS = {}
+
+# What a handler can ask the loader for. Anything else it reads is loaded lazily, if at all.
+#   'room'        the GameRoom, joined into the player's row
+#   'user'        the player's User, joined into the player's row
+#   'tram_tuong'  whether Trầm Tương is out on 3g7 right now (needs the room)
+NEEDS = ('room', 'user', 'tram_tuong')
+
+
+def action(name, roles=('Seeker', 'Hider'), needs=()):
+    """Register a dashboard action handler.
+
+    The handler gets an ActionContext and returns a response to end the request early, or None
+    to go back to the dashboard. It must not commit; the pipeline commits once for all phases.
+    """
+    unknown = set(needs) - set(NEEDS)
+    if unknown:
+        raise ValueError(f"Unknown needs for action '{name}': {sorted(unknown)}")
+
+    def register(func):
+        ACTIONS[name] = ActionHandler(name, func, tuple(roles), tuple(needs))
+        return func
+    return register
+
+
+class ActionStats:
+    """Per-action request count and latency, for /api/action_stats."""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            count, total, worst = self._stats.get(name, (0, 0.0, 0.0))
+            self._stats[name] = (count + 1, total + seconds, max(worst, seconds))
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {'count': count, 'avg_ms': round(total / count * 1000, 2), 'max_ms': round(worst * 1000, 2)}
+                for name, (count, total, worst) in sorted(self._stats.items())
+            }
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+action_stats = ActionStats()
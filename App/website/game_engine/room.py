@@ -0,0 +1,23 @@
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .rules import end_game_and_cleanup_room
+from .registry import action
+
+
+@action('restore', roles=('Seeker', 'Hider', 'Gamemaster'), needs=('room',))
+def restore(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    if state.role == 'Gamemaster':
+        log_msg = f"GAMEMASTER '{current_user.first_name}' has reset the game room."
+    elif current_user.id == state.room.host_id:
+        log_msg = f"HOST '{current_user.first_name}' has reset the game room."
+    else:
+        flash("Only the Room Host can restore the game!", "error")
+        return None
+
+    flash_msg = f"Room has been reset by Host."
+    end_game_and_cleanup_room(current_room_id, log_msg, flash_msg, commit=False)
+    return redirect(url_for('views.game_rooms'))
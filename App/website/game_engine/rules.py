@@ -0,0 +1,243 @@
+"""Game rules shared by the dashboard views, the action handlers and the scheduler.
+
+Nothing here renders a page: logs, thirst, room cleanup and the beasts' squares only.
+"""
+from datetime import datetime, timezone, timedelta
+from flask import flash, current_app, has_request_context
+from flask_login import current_user
+from sqlalchemy.orm import joinedload
+
+from .. import db
+from ..models import PlayerState, GameLog, GameRoom, GameChat, MovementEvent
+from ..board import JUNGLE_SQUARES
+from ..map_cache import map_tiles
+from ..water import water_remaining
+from ..herbs import delete_room_herbs
+from ..log_buffer import buffer_row, discard_room_rows, log_writer
+
+
+def is_lunar_eclipse(now_utc=None):
+    now_vietnam = (now_utc or datetime.now(timezone.utc)) + timedelta(hours=7)
+    return not (7 <= now_vietnam.hour < 22)
+
+
+def active_beast_squares(room, now_utc=None):
+    """Squares the beasts roam right now: the room's two, or all four forests during the lunar eclipse."""
+    if is_lunar_eclipse(now_utc):
+        return sorted(JUNGLE_SQUARES)
+    return [room.beast_square_1, room.beast_square_2]
+
+
+def get_travel_matrix():
+    """The travel matrix, imported (with NumPy) and loaded the first time a request needs it."""
+    from ..travel_matrix import travel_matrix
+    travel_matrix.ensure_loaded(cache_dir=current_app.config['TRAVEL_MATRIX_DIR'])
+    return travel_matrix
+
+
+def get_thirst_multiplier(state, last_active_time, is_window_active):
+    if (state.role == 'Seeker' and
+        state.current_location == '3g7' and
+        is_window_active):
+
+        inactive_time_elapsed = datetime.now(timezone.utc) - last_active_time
+        inactive_minutes = inactive_time_elapsed.total_seconds() / 60
+
+        if inactive_minutes > 15:
+            return 3.0
+    return 1.0
+
+
+def create_game_log(state, log_message, privacy='team'):
+    if not state:
+        return
+    try:
+        buffer_row(
+            GameLog,
+            log_message=log_message,
+            user_id=state.user_id,
+            room_id=state.room_id,
+            team_id=state.team,
+            privacy=privacy
+        )
+    except Exception as e:
+        if has_request_context():
+            flash(f"Error while writing log: {e}", "error")
+        print(f"[ERROR] Error while writing log: {e}")
+
+
+def log_event(state, kind, detail=None, privacy='team', square=None, from_square=None, target=None, amount=None):
+    """Write a typed GameLog row (see game_events for the kinds); its text is rendered by the feed."""
+    if not state:
+        return
+    try:
+        buffer_row(
+            GameLog,
+            kind=kind,
+            detail=detail,
+            user_id=state.user_id,
+            room_id=state.room_id,
+            team_id=state.team,
+            privacy=privacy,
+            target_user_id=target.user_id if target is not None else None,
+            square=square,
+            from_square=from_square,
+            amount=amount
+        )
+    except Exception as e:
+        if has_request_context():
+            flash(f"Error while writing event: {e}", "error")
+        print(f"[ERROR] Error while writing event: {e}")
+
+
+def record_movement(state, from_square, to_square, method='move'):
+    if not state:
+        return
+    try:
+        buffer_row(
+            MovementEvent,
+            user_id=state.user_id,
+            room_id=state.room_id,
+            from_square=from_square,
+            to_square=to_square,
+            method=method
+        )
+    except Exception as e:
+        if has_request_context():
+            flash(f"Error while writing movement: {e}", "error")
+        print(f"[ERROR] Error while writing movement: {e}")
+
+
+def end_game_and_cleanup_room(room_id, log_message, flash_message, commit=True):
+    try:
+        room_to_delete = GameRoom.query.get(room_id)
+        if not room_to_delete:
+            print(f"Room {room_id} has been terminated already.")
+            return
+
+        all_players_in_room = PlayerState.query.filter_by(room_id=room_id).all()
+        for player in all_players_in_room:
+            db.session.delete(player)
+
+        GameLog.query.filter_by(room_id=room_id).delete()
+        GameChat.query.filter_by(room_id=room_id).delete()
+        MovementEvent.query.filter_by(room_id=room_id).delete()
+        discard_room_rows(room_id)
+        delete_room_herbs(room_id)
+        map_tiles.delete_room(room_id)
+
+        log_user_id = current_user.id if has_request_context() and current_user.is_authenticated else None
+        buffer_row(GameLog, log_message=log_message, user_id=log_user_id, room_id=room_id, privacy='public')
+        db.session.delete(room_to_delete)
+        if commit:
+            db.session.commit()
+        if has_request_context():
+            flash(flash_message, "success_center")
+    except Exception as e:
+        db.session.rollback()
+        if has_request_context():
+            flash(f"Extreme error occurs due to cleaning a room up: {e}", "error")
+        print(f"[ERROR] Can not clean the room {room_id}: {e}")
+
+
+def resolve_thirst(state, commit=True):
+    """Revive or eliminate a player whose water has run out, and commit it unless commit is False.
+
+    Returns (still_playing, message, category); message is None when end_game_and_cleanup_room
+    already flashed. Used by the dashboard and by the background sweeper, so it never reads
+    current_user.
+    """
+    user = state.user
+    now = datetime.now(timezone.utc)
+
+    if state.has_quynh_tam_thao:
+        state.has_quynh_tam_thao = False
+        state.current_water = 2.0
+        state.last_action_time = now
+        create_game_log(state, f"Player '{user.first_name}' ({state.team}) used 'Quỳnh tâm hoán mệnh thảo' to revive.", privacy='public')
+        if commit:
+            db.session.commit()
+        return True, "You ran out of water, but 'Quỳnh tâm hoán mệnh thảo' saved you! 2.0 water bars is recoveried.", "success"
+
+    state.current_water = 0
+    state.last_action_time = now
+    state.game_status = "Eliminated (Thirst)"
+
+    if state.role == 'Hider':
+        hider_team = state.team
+        hider_room_id = state.room_id
+        hider_room_name = state.room.room_name
+
+        log_event(state, 'elimination', 'thirst_hider', privacy='public', square=state.current_location)
+
+        user.score -= 10
+        db.session.add(user)
+
+        db.session.delete(state)
+
+        # Stored water is only the level at each player's last action, so compare the levels now.
+        candidates = PlayerState.query.filter(
+            PlayerState.room_id == hider_room_id,
+            PlayerState.team == hider_team,
+            PlayerState.game_status == "Active",
+            PlayerState.role == "Seeker"
+        ).all()
+        new_hider_state = max(candidates, key=lambda candidate: candidate.water_now, default=None)
+
+        if not new_hider_state:
+            log_msg_game_over = f"Team {hider_team} has no Seekers left to become the new Hider. Team {hider_team} loses. Room '{hider_room_name}' is terminated."
+            flash_msg_game_over = f"You were eliminated (Score: -10pt), and your team has no one left to hide. Team {hider_team} loses."
+
+            if commit:
+                db.session.commit()
+
+            end_game_and_cleanup_room(hider_room_id, log_msg_game_over, flash_msg_game_over, commit=commit)
+            return False, None, None
+
+        new_hider_state.role = "Hider"
+
+        log_msg_new_hider = f"'{new_hider_state.user.first_name}' ({hider_team}) is the new Hider at {new_hider_state.current_location}."
+
+        create_game_log(new_hider_state, log_msg_new_hider, privacy='team')
+        if commit:
+            db.session.commit()
+        return False, f"You ran out of water and were eliminated! Your score: -10pt. '{new_hider_state.user.first_name}' is now your team's Hider.", "error"
+
+    log_msg = f"Seeker named '{user.first_name}' ({state.team}) is terminated due to running out of water {state.current_location}."
+    log_writer.submit(GameLog, log_message=log_msg, user_id=user.id)
+
+    db.session.delete(state)
+    if commit:
+        db.session.commit()
+    return False, "You are terminated by running out of water!", "error"
+
+
+def sweep_thirst():
+    """Eliminate (or revive) every player whose water ran out while nobody was looking."""
+    now = datetime.now(timezone.utc)
+    players = PlayerState.query.options(joinedload(PlayerState.user), joinedload(PlayerState.room)).filter(
+        PlayerState.game_status == "Active",
+        PlayerState.role.in_(['Seeker', 'Hider'])
+    ).all()
+
+    # Ids only: every resolve commits, and a game it ends deletes the rest of that room's rows.
+    dry_players = [(state.id, state.room_id) for state in players
+                   if state.room is not None and water_remaining(state, now) <= 0]
+
+    resolved = 0
+    ended_rooms = set()
+    for player_id, room_id in dry_players:
+        if room_id in ended_rooms:
+            continue
+        try:
+            state = db.session.get(PlayerState, player_id)
+            if state is None or state.game_status != "Active" or water_remaining(state, now) > 0:
+                continue
+            resolve_thirst(state)
+            resolved += 1
+            if db.session.get(GameRoom, room_id) is None:
+                ended_rooms.add(room_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error while resolving thirst for player {player_id}: {e}")
+    return resolved
@@ -0,0 +1,193 @@
+from datetime import datetime, timezone, timedelta
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .. import db
+from ..models import PlayerState, MovementEvent
+from ..board import get_super_square
+from .rules import create_game_log, log_event, end_game_and_cleanup_room
+from .registry import action
+
+
+@action('search', roles=('Seeker',))
+def search(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+    if state.search_turns_left <= 0:
+        return None
+
+    state.search_turns_left -= 1
+
+    state.last_action_time = datetime.now(timezone.utc)
+    state.last_active_post_time = datetime.now(timezone.utc)
+    current_loc = state.current_location
+    current_team = state.team
+
+
+    found_hider = PlayerState.query.filter(
+        PlayerState.room_id == current_room_id,
+        PlayerState.role == 'Hider',
+        PlayerState.team != current_team,
+        PlayerState.current_location == current_loc
+    ).first()
+
+    if found_hider:
+        log_msg = f"Seeker named '{current_user.first_name}' ({state.team}) found a hider named '{found_hider.user.first_name}' ({found_hider.team}) in '{state.current_location}'. {state.team} WON!"
+        flash_msg = f"You found the Hider! {state.team} wins! Exam over."
+
+
+        winning_team_players = PlayerState.query.filter(
+            PlayerState.room_id == current_room_id,
+            PlayerState.team == state.team,
+            PlayerState.game_status == "Active"
+        ).all()
+
+        if winning_team_players:
+            points_per_player = 60 / len(winning_team_players)
+            points_per_player = round(points_per_player, 2)
+
+            for player_state in winning_team_players:
+                player_state.user.score += points_per_player
+                db.session.add(player_state.user)
+
+        end_game_and_cleanup_room(current_room_id, log_msg, flash_msg, commit=False)
+        return redirect(url_for('views.game_rooms'))
+
+    else:
+        flash(f"You sought the partial square '{state.current_location}'. No one is here.", "info")
+        log_event(state, 'search', privacy='private', square=current_loc)
+
+
+@action('detect', roles=('Seeker',))
+def detect(ctx):
+    state = ctx.state
+    if state.detect_turns_left <= 0:
+        return None
+
+    now_utc = datetime.now(timezone.utc)
+    vietnam_tz_offset = timedelta(hours=7)
+    now_vietnam = now_utc + vietnam_tz_offset
+    current_hour_vietnam = now_vietnam.hour
+
+    if not True: #(7 <= current_hour_vietnam < 22):
+        flash("You are just able to Detect in 7:00AM to 10:00PM in real time.", "error")
+        pass
+    elif state.detect_turns_left <= 0:
+        flash("You ran out of turn to Detect.", "error")
+        pass
+    else:
+        state.detect_turns_left -= 1
+        state.is_detecting = True
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+        flash(f"Detect activated! You can now see opposing Seekers. (Turns left: {state.detect_turns_left})", "success")
+        create_game_log(state, f"Seeker named {current_user.first_name} used 'Detect' to reveal enemies.", privacy='team')
+
+
+@action('track', roles=('Seeker', 'Hider'))
+def track(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    active_afk_hours = (datetime.now(timezone.utc) - ctx.last_active_time).total_seconds() / 3600
+
+    if active_afk_hours <= 12 or state.role != 'Seeker':
+        flash("You are not eligible to use this action yet.", "error")
+    else:
+
+        enemy_hider = PlayerState.query.filter(
+            PlayerState.room_id == current_room_id,
+            PlayerState.team != state.team,
+            PlayerState.role == 'Hider'
+        ).first()
+
+        if enemy_hider:
+            seeker_main_square = state.current_location[1:]
+            hider_main_square = enemy_hider.current_location[1:]
+            hider_super_square_zone = get_super_square(hider_main_square)
+
+            if seeker_main_square in hider_super_square_zone:
+                state.has_tracked = True
+                flash("Your senses are sharp! You feel the Hider is nearby.", "success")
+                create_game_log(state, f"Seeker {current_user.first_name} ({state.team}) used Tracker and sensed the Hider is nearby!", privacy='public')
+                hiders_team_id = enemy_hider.team
+
+
+                hiders_team_players = PlayerState.query.filter_by(
+                    room_id=current_room_id,
+                    team=hiders_team_id
+                ).all()
+
+                item_was_dispelled = False
+                for player in hiders_team_players:
+                    if player.has_nhat_nguyet_thao:
+                        player.has_nhat_nguyet_thao = False
+                        item_was_dispelled = True
+                if item_was_dispelled:
+                    log_msg_dispel = f"The Hider's team was successfully tracked! All 'Nhật nguyệt tinh luân thảo' immunity effects on that team have been dispelled."
+                    create_game_log(state, log_msg_dispel, privacy='public')
+            else:
+                flash("You sense nothing. The Hider is not in this super square.", "info")
+                create_game_log(state, f"Seeker {current_user.first_name} used Tracker but sensed nothing.", privacy='private')
+        else:
+            flash("There is no Hider to track.", "error")
+
+
+        state.last_active_post_time = datetime.now(timezone.utc)
+
+
+@action('disclose_trace', roles=('Seeker',))
+def disclose_trace(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    target_id = ctx.form.get('target_id')
+
+    if not state.has_phan_thien_thao:
+        flash("You do not have a 'Phần Thiên Truy Long Thảo'.", "error")
+
+    elif not target_id:
+        flash("You have not selected a target to disclose yet.", "error")
+
+    else:
+        target_state = PlayerState.query.filter_by(user_id=int(target_id)).first()
+
+        if not target_state or target_state.room_id != current_room_id or target_state.team == state.team:
+            flash("Targer is invalid!", "error")
+        else:
+            now_utc = datetime.now(timezone.utc)
+            vietnam_tz_offset = timedelta(hours=7)
+            now_vietnam = now_utc + vietnam_tz_offset
+
+            start_of_day_vn = now_vietnam.replace(hour=0, minute=0, second=0, microsecond=0)
+
+            start_of_day_utc = start_of_day_vn - vietnam_tz_offset
+
+            # Teleports are kept in the table too, but the item only ever disclosed walked moves.
+            movements = MovementEvent.query.filter(
+                MovementEvent.room_id == current_room_id,
+                MovementEvent.user_id == target_state.user_id,
+                MovementEvent.timestamp >= start_of_day_utc,
+                MovementEvent.method == 'move'
+            ).order_by(MovementEvent.timestamp.asc()).all()
+
+            if not movements:
+                history_str = "There is not any move today."
+            else:
+                history_steps = []
+                for movement in movements:
+                    move_time_vn = movement.timestamp + vietnam_tz_offset
+                    time_str = move_time_vn.strftime('%H:%M')
+
+                    history_steps.append(f"[{time_str}] from '{movement.from_square}' to '{movement.to_square}'")
+
+                history_str = " | ".join(history_steps)
+
+
+            state.has_phan_thien_thao = False
+
+            public_msg = f"Seeker '{current_user.first_name}' ({state.team}) disclosed all traces of '{target_state.user.first_name}' ({target_state.team}) today. TARGET MOVING'S HISTORY: {history_str}"
+
+            create_game_log(state, public_msg, privacy='public')
+
+            flash(f"Disclosed '{target_state.user.first_name}' successfully!", "success")
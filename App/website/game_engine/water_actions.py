@@ -0,0 +1,119 @@
+from datetime import datetime, timezone
+from flask import flash, redirect, url_for
+from flask_login import current_user
+
+from .. import db
+from ..models import PlayerState
+from ..board import FRESH_WATER_LOCATIONS, check_if_main_square_is_coastal
+from ..water import settle_water
+from .rules import create_game_log, log_event
+from .registry import action
+
+
+@action('take_water', roles=('Seeker',))
+def take_water(ctx):
+    state = ctx.state
+
+    current_loc = state.current_location
+    if state.take_water_turns_left <= 0:
+        flash("You ran out of turn to take water.", "error")
+
+    elif current_loc not in FRESH_WATER_LOCATIONS:
+        flash("You are not in a partial square with water.", "error")
+
+    elif state.current_water == 10.0:
+        flash("Your water bars is full already.", "info")
+
+    else:
+        state.current_water = 10.0
+        state.take_water_turns_left -= 1
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+
+        flash(f"Water bars refilled successfully!.", "success")
+        create_game_log(state, f"Seeker '{current_user.first_name}' ({state.team}) took water in '{current_loc}'.", privacy='team')
+
+
+@action('purify_water', roles=('Seeker', 'Hider'))
+def purify_water(ctx):
+    state = ctx.state
+
+    current_main_square = state.current_location[1:]
+
+    if not state.has_seawater_purifier:
+        flash("You do not have a 'Hải tâm thanh tịnh thảo'.", "error")
+
+    elif not check_if_main_square_is_coastal(current_main_square):
+        flash("You need to stand on a main square having at least one seawater partial square to filtrate.", "error")
+
+    else:
+        state.has_seawater_purifier = False
+        state.current_water = 10.0
+        state.last_action_time = datetime.now(timezone.utc)
+        state.last_active_post_time = datetime.now(timezone.utc)
+
+        flash(f"You used 'Hải tâm thanh tịnh thảo' to filtrate seawater in '{current_main_square}'. Water bars filled fully!", "success")
+        create_game_log(state, f"Seeker '{current_user.first_name}' ({state.team}) used 'Hải tâm thanh tịnh thảo' in '{state.current_location}'.", privacy='team')
+
+
+@action('transfer_water', roles=('Seeker', 'Hider'))
+def transfer_water(ctx):
+    state = ctx.state
+    current_room_id = state.room_id
+
+    try:
+        receiver_id = ctx.form.get('receiver_id')
+        amount_str = ctx.form.get('amount')
+
+        if not receiver_id or not amount_str:
+            flash("Receiver and amount are required.", "error")
+            return redirect(url_for('views.game_dashboard'))
+
+        amount = round(float(amount_str), 2)
+        receiver_state = PlayerState.query.with_for_update().filter_by(user_id=int(receiver_id),room_id=current_room_id).first()
+
+
+        max_transfer = round(state.current_water - 0.5, 2)
+        if amount <= 0:
+            flash("Transfer amount must be greater than 0.", "error")
+        elif amount > max_transfer:
+            flash(f"You can only transfer a maximum of {max_transfer} water bars.", "error")
+
+
+        elif not receiver_state:
+            flash("Receiver not found.", "error")
+        elif receiver_state.room_id != current_room_id:
+            flash("Receiver is not in your room.", "error")
+        elif receiver_state.team != state.team:
+            flash("You can only transfer water to your teammates.", "error")
+        else:
+            is_local = (receiver_state.current_location == state.current_location)
+            is_remote = not is_local
+
+            if is_remote and not state.has_remote_water:
+
+                flash(f"You must be at the same location '({receiver_state.current_location})' as '{receiver_state.user.first_name}' to transfer water.", "error")
+            else:
+
+                state.current_water -= amount
+                settle_water(receiver_state)
+                receiver_state.current_water += amount
+                if receiver_state.current_water > 10.0:
+                    receiver_state.current_water = 10.0
+                state.last_action_time = datetime.now(timezone.utc)
+                state.last_active_post_time = datetime.now(timezone.utc)
+                transfer_kind = 'local'
+
+
+                if is_remote and state.has_remote_water:
+                    state.has_remote_water = False
+                    transfer_kind = 'remote'
+
+                log_event(state, 'transfer', transfer_kind, target=receiver_state, amount=amount)
+                flash(f"Successfully transferred {amount} water to {receiver_state.user.first_name}!", "success")
+
+    except ValueError:
+        flash("Invalid amount. Please enter a valid number.", "error")
+    except Exception as e:
+        db.session.rollback()
+        flash(f"An error occurred during transfer: {e}", "error")
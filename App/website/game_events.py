@@ -0,0 +1,79 @@
+"""Text for typed GameLog rows.
+
+Typed rows only store who did what where (kind, detail, actor, target, squares, amount).
+The sentence players read is built here when the feed is shown; rows written before events
+existed, and the kinds of message that are not events, still carry log_message.
+"""
+
+HERB_NAMES = {
+    'tuong_tu': 'Tương tư đoạn trường thảo',
+    'thuong_quan': 'Thượng quan tử uyển thảo',
+    'quynh_tam': 'Quỳnh tâm hoán mệnh thảo',
+    'ly_sau': 'Ly sầu tán phách thảo',
+    'nhat_nguyet': 'Nhật nguyệt tinh luân thảo',
+    'tram_tuong': 'Trầm tương vọng nguyệt thảo',
+    'hai_tam': 'Hải tâm thanh tịnh thảo',
+    'u_tam': 'U tâm tịch diệt thảo',
+    'phan_thien': 'Phần Thiên Truy Long Thảo'
+}
+
+# Rooms always hold exactly these two teams.
+ENEMY_TEAM = {'TeamA': 'TeamB', 'TeamB': 'TeamA'}
+
+# (kind, detail) -> template. (kind, None) is used when the detail has no template of its own.
+EVENT_TEMPLATES = {
+    ('move', None): "Seeker '{actor}' ({team}) moved from '{from_square}' to '{square}'.",
+    ('teleport', None): "Seeker named '{actor}' ({team}) did teleport from '{from_square}' to '{square}' (Item consumed).",
+    ('search', None): "Seeker {actor} searched {square} but found nothing.",
+
+    ('gather', None): "Seeker '{actor}' ({team}) gathered '{herb}' successfully.",
+    ('gather', 'hai_tam'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'u_tam'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'phan_thien'): "Seeker '{actor}' ({team}) gathered '{herb}'.",
+    ('gather', 'tram_tuong'): "Seeker '{actor}' ({team}) gathered '{herb}' in '{square}'.",
+    ('gather', 'nhat_nguyet'): "Seeker '{actor}' ({team}) gathered '{herb}' and is now IMMUNE to Detect.",
+    ('gather', 'nhat_nguyet_void'): "Seeker '{actor}' ({team}) gathered 'Nhật nguyệt tinh luân thảo', but it had no effect as the Hider was already tracked by all enemies.",
+    ('gather', 'tram_tuong_none'): "Seeker '{actor}' ({team}) gathered in '{square}' but found nothing.",
+    ('gather', 'nothing'): "Seeker '{actor}' ({team}) gathered at '{square}' but found nothing.",
+
+    ('trap', 'set'): "Seeker '{actor}' ({team}) set a deadly trap ('U tâm tịch diệt thảo') in somewhere on island. Be careful!",
+    ('trap', 'sprung'): "Seeker '{actor}' ({team}) have fallen into the trap of '{target}' in '{square}' and lose {amount} water bars!",
+
+    ('combat', 'majority_win'): "Combat in '{square}': {team} (The majority) defeated {enemy_team}.",
+    ('combat', 'majority_loss'): "Combat in '{square}': {team} is dominated by {enemy_team}.",
+    ('combat', 'duel_win'): "Duel in '{square}': {actor} defeated {target}.",
+    ('combat', 'duel_loss'): "Duel in '{square}': {actor} is defeated by {target}.",
+    ('combat', 'duel_draw'): "Duel in '{square}': {actor} and {target} draw.",
+    ('combat', 'beast'): "Seeker named '{actor}' in ({team}) encountered a wild beast! His current position is {square}.",
+
+    ('transfer', 'local'): "Seeker '{actor}' (LOCAL) transfered {amount} water to '{target}'.",
+    ('transfer', 'remote'): "Seeker '{actor}' (REMOTE (Item consumed)) transfered {amount} water to '{target}'.",
+
+    ('elimination', 'thirst'): "Seeker named '{actor}' ({team}) is terminated due to running out of water while trying to move to '{square}'.",
+    ('elimination', 'thirst_hider'): "Hider named '{actor}' ({team}) ran out of water and was eliminated.",
+    ('elimination', 'trap'): "Seeker '{actor}' ({team}) is terminated due to step into a trap.",
+    ('elimination', 'beast'): "Seeker named '{actor}' ({team}) was eliminated by a beast while trying to move to '{square}'."
+}
+
+
+def _name(user):
+    return user.first_name if user is not None else 'Unknown'
+
+
+def describe(log):
+    """The sentence for a GameLog row; reads log.user and log.target, so load them with the rows."""
+    if log.kind is None:
+        return log.log_message
+    template = EVENT_TEMPLATES.get((log.kind, log.detail)) or EVENT_TEMPLATES.get((log.kind, None))
+    if template is None:
+        return log.log_message or f"{log.kind} ({log.detail})"
+    return template.format(
+        actor=_name(log.user),
+        target=_name(log.target),
+        team=log.team_id,
+        enemy_team=ENEMY_TEAM.get(log.team_id, 'the enemy'),
+        square=log.square,
+        from_square=log.from_square,
+        amount=log.amount,
+        herb=HERB_NAMES.get(log.detail, log.detail)
+    )
@@ -0,0 +1,103 @@
+import threading
+from sqlalchemy import event, delete
+
+from . import db
+from .models import HerbSpawn
+
+
+class HerbCache:
+    """room_id -> {square: herb_code} for the herbs still on the board, loaded on first use.
+
+    Writes go through replace_room_herbs() and pick_herb(); the rooms they touch are
+    dropped from the cache once their transaction commits. Like room_state, other
+    processes' writes are not seen.
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, room_id):
+        with self._lock:
+            herbs = self._rooms.get(room_id)
+            generation = self._generations.get(room_id, 0)
+        if herbs is None:
+            herbs = dict(db.session.query(HerbSpawn.square, HerbSpawn.herb_code).filter_by(room_id=room_id).all())
+            with self._lock:
+                # A commit that landed while we were reading must not be hidden by our older copy.
+                if self._generations.get(room_id, 0) == generation:
+                    self._rooms[room_id] = herbs
+        return herbs
+
+    def forget(self, room_ids):
+        with self._lock:
+            for room_id in room_ids:
+                self._rooms.pop(room_id, None)
+                self._generations[room_id] = self._generations.get(room_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+
+
+herb_cache = HerbCache()
+
+
+def _mark_changed(room_id):
+    db.session.info.setdefault('herb_rooms', set()).add(room_id)
+
+
+def room_herbs(room_id):
+    return herb_cache.get(room_id)
+
+
+def replace_room_herbs(room_id, spawn_date, mapping):
+    """Swap the room's herbs for a new {square: herb_code} spawn, in the caller's transaction."""
+    db.session.execute(delete(HerbSpawn).where(HerbSpawn.room_id == room_id))
+    if mapping:
+        db.session.execute(HerbSpawn.__table__.insert(), [
+            {'room_id': room_id, 'square': square, 'herb_code': herb_code, 'spawn_date': spawn_date}
+            for square, herb_code in mapping.items()
+        ])
+    _mark_changed(room_id)
+
+
+def delete_room_herbs(room_id):
+    db.session.execute(delete(HerbSpawn).where(HerbSpawn.room_id == room_id))
+    _mark_changed(room_id)
+
+
+def pick_herb(room_id, square):
+    """Take the herb on a square off the board and return its code, or None if there is none (left)."""
+    herb_code = db.session.execute(
+        delete(HerbSpawn)
+        .where(HerbSpawn.room_id == room_id, HerbSpawn.square == square)
+        .returning(HerbSpawn.herb_code)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if herb_code is not None:
+        _mark_changed(room_id)
+    return herb_code
+
+
+def _forget_changed_herbs(session):
+    room_ids = session.info.pop('herb_rooms', None)
+    if room_ids:
+        herb_cache.forget(room_ids)
+
+
+def _discard_changed_herbs(session):
+    session.info.pop('herb_rooms', None)
+
+
+_hooks_registered = False
+
+
+def init_herbs(app):
+    global _hooks_registered
+    if _hooks_registered:
+        return
+    event.listen(db.session, 'after_commit', _forget_changed_herbs)
+    event.listen(db.session, 'after_rollback', _discard_changed_herbs)
+    _hooks_registered = True
@@ -0,0 +1,149 @@
+import atexit
+import queue
+import threading
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import event
+
+from . import db
+from .activity_feed import notify_rooms
+
+
+def buffer_row(model, **values):
+    """Queue a GameLog / Notification / MovementEvent row for the session's next commit.
+
+    Everything queued is written with one executemany per model right before the commit, inside
+    the same transaction, so a rollback drops the rows just like rows added to the session.
+    With LOG_BUFFER off the row is simply added to the session.
+    """
+    values.setdefault('timestamp', datetime.now(timezone.utc))
+    if not current_app.config.get('LOG_BUFFER', True):
+        db.session.add(model(**values))
+        return
+    db.session.info.setdefault('log_buffer', []).append((model, values))
+
+
+def discard_room_rows(room_id):
+    """Drop queued rows of a room that is being deleted in this transaction."""
+    rows = db.session.info.get('log_buffer')
+    if rows:
+        rows[:] = [(model, values) for model, values in rows if values.get('room_id') != room_id]
+
+
+def _write_buffer(session):
+    rows = session.info.pop('log_buffer', None)
+    if not rows:
+        return
+    # One executemany per table and column set. Core keeps explicit None values, which
+    # ORM bulk inserts would drop, so typed events with empty fields still share a statement.
+    batches = {}
+    for model, values in rows:
+        batches.setdefault((model, frozenset(values)), []).append(values)
+    for (model, _), batch in batches.items():
+        session.execute(model.__table__.insert(), batch)
+    rooms = {values['room_id'] for model, values in rows if values.get('room_id') is not None}
+    session.info.setdefault('log_buffer_rooms', set()).update(rooms)
+
+
+def _notify_buffer_rooms(session):
+    rooms = session.info.pop('log_buffer_rooms', None)
+    if rooms:
+        notify_rooms(rooms)
+
+
+def _forget_buffer(session, previous_transaction):
+    session.info.pop('log_buffer', None)
+    session.info.pop('log_buffer_rooms', None)
+
+
+class LogWriter:
+    """Writes rows nobody reads back in the same request from a background thread.
+
+    submit() returns at once; the thread commits whatever has queued up in one transaction.
+    When disabled, submit() falls back to buffer_row() and the row goes out with the request's commit.
+    Rows still queued when the process exits are written by the atexit hook.
+    """
+
+    def __init__(self, batch_size=500):
+        self.enabled = False
+        self.batch_size = batch_size
+        self._app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def configure(self, app, enabled=False):
+        self._app = app
+        self.enabled = enabled
+
+    def submit(self, model, **values):
+        if not self.enabled:
+            buffer_row(model, **values)
+            return
+        values.setdefault('timestamp', datetime.now(timezone.utc))
+        self._queue.put((model, values))
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows):
+        with self._app.app_context():
+            try:
+                db.session.info.setdefault('log_buffer', []).extend(rows)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error in log writer, {len(rows)} row(s) lost: {e}")
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            rows = [item for item in batch if item is not None]
+            try:
+                if rows:
+                    self._write(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(rows) < len(batch):
+                return
+
+    def drain(self):
+        """Write everything queued so far; returns once the queue is empty."""
+        self._queue.join()
+
+    def shutdown(self, timeout=5):
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+
+log_writer = LogWriter()
+atexit.register(log_writer.shutdown)
+
+
+_hooks_registered = False
+
+
+def init_log_buffer(app):
+    global _hooks_registered
+    log_writer.configure(app, enabled=app.config.get('ASYNC_LOG_WRITER', False))
+    if _hooks_registered:
+        return
+    event.listen(db.session, 'before_commit', _write_buffer)
+    event.listen(db.session, 'after_commit', _notify_buffer_rooms)
+    # Soft rollbacks too: rows can be queued before the session has opened a transaction.
+    event.listen(db.session, 'after_soft_rollback', _forget_buffer)
+    _hooks_registered = True
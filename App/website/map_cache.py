@@ -0,0 +1,126 @@
+import os
+import glob
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# Bump when the drawing code changes so browsers drop their cached maps.
+MAP_RENDER_VERSION = 1
+
+
+def game_map_etag(beast_squares, markers):
+    """Strong ETag for a map: same visible squares and markers always give the same image."""
+    payload = json.dumps([MAP_RENDER_VERSION, sorted(sq for sq in beast_squares if sq), markers], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TileCache:
+    """Pre-rendered room backgrounds (board plus beast crosses), one per (room, day, eclipse).
+
+    Tiles live in a small in-memory LRU and, with a cache_dir, in .npz files shared by every
+    process rendering maps (the render pool workers included). Maps without a tile key
+    (no beasts visible) use one plain tile per set of beast squares, kept in memory only.
+    """
+
+    def __init__(self, cache_dir=None, max_entries=16):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def configure(self, cache_dir=None, max_entries=None):
+        self.cache_dir = cache_dir
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, tile_key):
+        room_id, day, eclipse = tile_key
+        return os.path.join(self.cache_dir, f"room{room_id}_{day}_{'eclipse' if eclipse else 'day'}_v{MAP_RENDER_VERSION}.npz")
+
+    def _remember(self, key, pixels):
+        self._tiles[key] = pixels
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_entries:
+            self._tiles.popitem(last=False)
+
+    def get(self, board, beast_squares, tile_key=None):
+        """The tile's RGBA pixels, drawn on `board` (a map_render board) when it is nowhere to be found."""
+        import numpy as np
+
+        key = ('room',) + tuple(tile_key) if tile_key else ('plain',) + tuple(beast_squares)
+        with self._lock:
+            pixels = self._tiles.get(key)
+            if pixels is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return pixels
+
+        path = self._path(tile_key) if tile_key and self.cache_dir else None
+        if path:
+            try:
+                with np.load(path) as tile:
+                    pixels = tile['pixels']
+                self.disk_hits += 1
+            except (OSError, KeyError, ValueError):
+                pixels = None
+
+        if pixels is None:
+            self.misses += 1
+            pixels = board.draw_tile(beast_squares)
+            if path:
+                self._write(path, tile_key, pixels)
+
+        with self._lock:
+            self._remember(key, pixels)
+        return pixels
+
+    def _write(self, path, tile_key, pixels):
+        import numpy as np
+
+        try:
+            # Write then rename, so a worker never loads half a file.
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, pixels=pixels)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error while writing map tile: {e}")
+            return
+        # A room only ever needs today's tiles.
+        self._delete_files(tile_key[0], keep_day=tile_key[1])
+
+    def _delete_files(self, room_id, keep_day=None):
+        prefix = f"room{room_id}_"
+        for path in glob.glob(os.path.join(self.cache_dir, f"{prefix}*.npz")):
+            if keep_day is None or not os.path.basename(path).startswith(f"{prefix}{keep_day}_"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def delete_room(self, room_id):
+        """Forget every tile of a room, on disk too; called when the room is deleted."""
+        with self._lock:
+            for key in [key for key in self._tiles if key[0] == 'room' and key[1] == room_id]:
+                del self._tiles[key]
+            if self.cache_dir:
+                self._delete_files(room_id)
+
+    def stats(self):
+        return {
+            'entries': len(self._tiles),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'persistent': bool(self.cache_dir)
+        }
+
+
+map_tiles = TileCache()
@@ -0,0 +1,271 @@
+import io
+import base64
+import threading
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.transforms import Bbox
+import matplotlib.image as mpimg
+
+from .map_cache import map_tiles
+
+
+COLUMN_LABELS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
+ROW_LABELS = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']
+
+MAP_FIGSIZE = 8
+MAP_DPI = 100
+# Extra canvas around the board so labels next to the edge are never cut off.
+MAP_MARGIN = 1.5
+# Same padding savefig(bbox_inches='tight') uses.
+MAP_PAD_INCHES = 0.1
+
+
+class _Board:
+    """The empty board (grid and labels) every map is drawn on, laid out once per process."""
+
+    def __init__(self):
+        # Lay the board out exactly like the old 8x8 pyplot figure...
+        probe = Figure(figsize=(MAP_FIGSIZE, MAP_FIGSIZE), dpi=MAP_DPI)
+        FigureCanvasAgg(probe)
+        probe_ax = probe.add_subplot()
+        _draw_board(probe_ax)
+        probe.tight_layout()
+        left, bottom, width, height = probe_ax.get_position().bounds
+
+        # ...then move that axes into a bigger canvas with free space around it.
+        size = MAP_FIGSIZE + 2 * MAP_MARGIN
+        self.figure = Figure(figsize=(size, size), dpi=MAP_DPI)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_axes([
+            (left * MAP_FIGSIZE + MAP_MARGIN) / size,
+            (bottom * MAP_FIGSIZE + MAP_MARGIN) / size,
+            width * MAP_FIGSIZE / size,
+            height * MAP_FIGSIZE / size
+        ])
+        _draw_board(self.ax)
+
+        self.canvas.draw()
+        self.renderer = self.canvas.get_renderer()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        # In display pixels, like the label extents it gets merged with.
+        self.tight_bbox = self.figure.get_tightbbox(self.renderer).transformed(self.figure.dpi_scale_trans)
+
+    def draw_tile(self, beast_squares):
+        """RGBA pixels of the board with the beast crosses drawn on it."""
+        self.canvas.restore_region(self.background)
+        crosses = []
+        for beast_loc in beast_squares:
+            try:
+                x = ord(beast_loc[0]) - ord('a') + 0.5
+                y = int(beast_loc[1:]) - 0.5
+                crosses.extend(self.ax.plot(x, y, 'rx', markersize=35, markeredgewidth=5, alpha=0.4, zorder=1))
+            except (IndexError, ValueError):
+                pass
+        try:
+            for artist in crosses:
+                self.ax.draw_artist(artist)
+            return np.asarray(self.canvas.buffer_rgba()).copy()
+        finally:
+            for artist in crosses:
+                artist.remove()
+
+
+def _draw_board(ax):
+    ax.set_xlim(0, 10)
+    ax.set_ylim(10, 0)
+    ax.set_xticks(range(10))
+    ax.set_yticks(range(10))
+    ax.set_xticklabels([])
+    ax.set_yticklabels([])
+    for i, label in enumerate(COLUMN_LABELS):
+        ax.text(i + 0.5, -0.5, label, ha='center', va='top')
+    for i, label in enumerate(ROW_LABELS):
+        ax.text(-0.3, i + 0.5, label, ha='right', va='center')
+    ax.grid(True, linestyle='--')
+
+
+
+_board = None
+_render_lock = threading.Lock()
+
+
+def _get_board():
+    global _board
+    if _board is None:
+        _board = _Board()
+    return _board
+
+
+def _add_marker(ax, marker):
+    artists = []
+    artists.extend(ax.plot(
+        marker['x'], marker['y'], marker['marker'],
+        color=marker['color'],
+        markersize=marker['size'],
+        alpha=marker.get('alpha'),
+        zorder=marker.get('zorder', 2),
+        markeredgecolor=marker.get('edgecolor')
+    ))
+
+    labels = []
+    if marker.get('label'):
+        label_style = marker.get('label_style', {})
+        labels.append(ax.text(
+            marker['x'] + 0.2, marker['y'] - 0.2, marker['label'],
+            color=marker['color'],
+            fontsize=label_style.get('fontsize'),
+            weight=label_style.get('weight'),
+            zorder=label_style.get('zorder', 3)
+        ))
+    return artists, labels
+
+
+def render_game_map_png(beast_squares, markers, tile_key=None):
+    """Composite the dynamic markers onto the room's background tile and return PNG bytes.
+
+    beast_squares: main squares to draw the beast cross on (already filtered by visibility).
+    markers: dicts with x, y, marker, color, size and optional alpha, zorder, edgecolor,
+             label, label_style.
+    tile_key: (room_id, day, eclipse) the beast squares belong to, to share the tile on disk.
+    """
+    beast_squares = tuple(sorted(set(sq for sq in beast_squares if sq)))
+    with _render_lock:
+        board = _get_board()
+        ax = board.ax
+
+        np.asarray(board.canvas.buffer_rgba())[...] = map_tiles.get(board, beast_squares, tile_key)
+
+        points = []
+        labels = []
+        for marker in markers:
+            marker_points, marker_labels = _add_marker(ax, marker)
+            points.extend(marker_points)
+            labels.extend(marker_labels)
+
+        try:
+            for artist in sorted(points + labels, key=lambda a: a.get_zorder()):
+                ax.draw_artist(artist)
+
+            # Text is not clipped to the axes, so it may widen the tight bbox like savefig does.
+            extents = [board.tight_bbox]
+            for label in labels:
+                extents.append(label.get_window_extent(board.renderer))
+            crop = Bbox.union(extents).padded(MAP_PAD_INCHES * MAP_DPI)
+
+            pixels = np.asarray(board.canvas.buffer_rgba())
+            canvas_height = pixels.shape[0]
+            x0 = max(int(round(crop.x0)), 0)
+            x1 = min(x0 + int(crop.width), pixels.shape[1])
+            y0 = max(canvas_height - int(round(crop.y1)), 0)
+            y1 = min(y0 + int(crop.height), canvas_height)
+            image = pixels[y0:y1, x0:x1].copy()
+        finally:
+            for artist in points + labels:
+                artist.remove()
+
+    buf = io.BytesIO()
+    mpimg.imsave(buf, image, format='png', dpi=MAP_DPI)
+    return buf.getvalue()
+
+
+def generate_plot_base64(l, k, plot_data):
+
+    X1 = plot_data['X1']
+    Y1 = plot_data['Y1']
+    X2 = plot_data['X2']
+    Y2 = plot_data['Y2']
+    t_out = plot_data['t_out']
+
+
+    fig = Figure(figsize=(6, 6))
+    ax = fig.subplots()
+
+    ax.set_xlim(0, 10)
+    ax.set_ylim(10, 0)
+    ax.set_xticks(range(10))
+    ax.set_yticks(range(10))
+    ax.xaxis.set_ticks_position('top')
+    ax.xaxis.set_label_position('top')
+    ax.set_xticklabels([])
+    ax.set_yticklabels([])
+    for i, label in enumerate(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']):
+        ax.text(i + 0.5, -0.5, label, ha='center', va='top')
+    for i, label in enumerate(['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']):
+        ax.text(-0.3, i + 0.5, label, ha='right', va='center')
+    ax.plot(X1, Y1, 'ro')
+    ax.text(X1 + 0.2, Y1 - 0.2, l, color='red')
+    ax.plot(X2, Y2, 'ro')
+    ax.text(X2 + 0.2, Y2 - 0.2, k, color='red')
+    ax.annotate('', xy = (X2, Y2), xytext = (X1, Y1), arrowprops = dict(arrowstyle = '->', color = 'green', linewidth = 2))
+
+    if t_out <= 3600:
+        ax.text(5, 10.8, f"The expected time: {int(t_out)//60}m", color='blue', ha = 'center', va = 'bottom')
+    elif t_out > 3600:
+        ax.text(5, 10.8, f"The expected time: {int(t_out)//3600}h {(int(t_out)%3600)//60}m", color='blue', ha = 'center', va = 'bottom')
+
+    ax.grid(True, linestyle='--')
+
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+
+
+    data = base64.b64encode(buf.getbuffer()).decode("ascii")
+
+    return data
+
+
+def generate_violence_plot_base64(l, k, m, plot_data):
+
+    X1 = plot_data['X1']
+    Y1 = plot_data['Y1']
+    X2 = plot_data['X2']
+    Y2 = plot_data['Y2']
+    X3 = plot_data['X3']
+    Y3 = plot_data['Y3']
+    result_text = plot_data['result']
+
+    fig = Figure(figsize=(6, 6))
+    ax = fig.subplots()
+
+    ax.set_xlim(0, 10)
+    ax.set_ylim(10, 0)
+    ax.set_xticks(range(10))
+    ax.set_yticks(range(10))
+    ax.xaxis.set_ticks_position('top')
+    ax.xaxis.set_label_position('top')
+    ax.set_xticklabels([])
+    ax.set_yticklabels([])
+    for i, label in enumerate(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']):
+        ax.text(i + 0.5, -0.5, label, ha='center', va='top')
+    for i, label in enumerate(['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']):
+        ax.text(-0.3, i + 0.5, label, ha='right', va='center')
+
+
+    ax.plot(X1, Y1, 'ro')
+    ax.text(X1 + 0.2, Y1 - 0.2, l, color='red')
+    ax.plot(X2, Y2, 'ro')
+    ax.text(X2 + 0.2, Y2 - 0.2, k, color='red')
+
+
+    ax.plot(X3, Y3, 'bo')
+    ax.text(X3 + 0.2, Y3 - 0.2, m, color='blue')
+
+
+    ax.annotate('', xy = (X2, Y2), xytext = (X1, Y1), arrowprops = dict(arrowstyle = '->', color = 'green', linewidth = 2))
+
+
+    color = 'red' if result_text == "Violence occurs" else 'green'
+    ax.text(5, 10.8, result_text, color=color, ha = 'center', va = 'bottom', fontsize=12, weight='bold')
+
+    ax.grid(True, linestyle='--')
+
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+
+    data = base64.b64encode(buf.getbuffer()).decode("ascii")
+    return data
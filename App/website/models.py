@@ -4,6 +4,7 @@ from sqlalchemy.sql import func
 from sqlalchemy.ext.hybrid import hybrid_property
 import math
 from datetime import datetime, timezone, timedelta
+from .water import water_remaining
 
 
 class GameRoom(db.Model):
@@ -22,7 +23,6 @@ class GameRoom(db.Model):
     tram_tuong_herb_minute = db.Column(db.Integer, nullable=True)
 
     daily_herb_spawn_date = db.Column(db.Date, nullable=True)
-    daily_herb_mapping = db.Column(db.Text, nullable=True)
 
     mode = db.Column(db.String(20), default='simulation')
     players = db.relationship('PlayerState', back_populates='room', lazy='dynamic')
@@ -50,7 +50,32 @@ class Note(db.Model):
     date = db.Column(db.DateTime(timezone=True), default=func.now())
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
 
+
+# What the daily turn counters go back to at Vietnam midnight.
+DAILY_RESET_VALUES = {
+    '_detect_turns_left': 2,
+    '_take_water_turns_left': 1,
+    '_gather_turns_left': 2,
+    '_gathered_seawater_today': False
+}
+
+
+def daily_reset_due(last_reset, now=None):
+    # A row that was never reset (NULL) is due, like the first access used to treat it.
+    if last_reset is None:
+        return True
+    if last_reset.tzinfo is None:
+        last_reset = last_reset.replace(tzinfo=timezone.utc)
+    vietnam_tz_offset = timedelta(hours=7)
+    today_vietnam_date = ((now or datetime.now(timezone.utc)) + vietnam_tz_offset).date()
+    return today_vietnam_date > (last_reset + vietnam_tz_offset).date()
+
+
 class PlayerState(db.Model):
+    __table_args__ = (
+        db.Index('ix_player_state_room_id_team_role', 'room_id', 'team', 'role'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
 
@@ -99,82 +124,88 @@ class PlayerState(db.Model):
     _last_detect_reset = db.Column("last_detect_reset", db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     _gathered_seawater_today = db.Column("gathered_seawater_today", db.Boolean, default=False)
 
-    def _check_daily_reset(self):
-        now_utc = datetime.now(timezone.utc)
-        vietnam_tz_offset = timedelta(hours=7)
-        now_vietnam = now_utc + vietnam_tz_offset
-        today_vietnam_date = now_vietnam.date()
-
-        last_reset_utc = self._last_detect_reset
-
-        if last_reset_utc is None:
-            self._last_detect_reset = now_utc
-            last_reset_utc = now_utc
-
-        if last_reset_utc.tzinfo is None:
-            last_reset_utc = last_reset_utc.replace(tzinfo=timezone.utc)
-
-        last_reset_vietnam = last_reset_utc + vietnam_tz_offset
-        last_reset_vietnam_date = last_reset_vietnam.date()
-
-        if today_vietnam_date > last_reset_vietnam_date:
-            self._detect_turns_left = 2
-            self._take_water_turns_left = 1
-            self._gather_turns_left = 2
-            self._gathered_seawater_today = False
+    def _is_reset_due(self):
+        return daily_reset_due(self._last_detect_reset)
 
-
-            self._last_detect_reset = now_utc
-            return True
-        return False
+    def _check_daily_reset(self):
+        # Only called before a write; the getters below never touch the row.
+        if not self._is_reset_due():
+            return False
+        for key, value in DAILY_RESET_VALUES.items():
+            setattr(self, key, value)
+        self._last_detect_reset = datetime.now(timezone.utc)
+        return True
 
     @hybrid_property
     def detect_turns_left(self):
-        self._check_daily_reset()
-        return self._detect_turns_left
+        return DAILY_RESET_VALUES['_detect_turns_left'] if self._is_reset_due() else self._detect_turns_left
 
     @detect_turns_left.setter
     def detect_turns_left(self, value):
+        self._check_daily_reset()
         self._detect_turns_left = value
 
 
     @hybrid_property
     def take_water_turns_left(self):
-        self._check_daily_reset()
-        return self._take_water_turns_left
+        return DAILY_RESET_VALUES['_take_water_turns_left'] if self._is_reset_due() else self._take_water_turns_left
 
     @take_water_turns_left.setter
     def take_water_turns_left(self, value):
+        self._check_daily_reset()
         self._take_water_turns_left = value
 
     @hybrid_property
     def gather_turns_left(self):
-        self._check_daily_reset()
-        return self._gather_turns_left
+        return DAILY_RESET_VALUES['_gather_turns_left'] if self._is_reset_due() else self._gather_turns_left
 
     @gather_turns_left.setter
     def gather_turns_left(self, value):
+        self._check_daily_reset()
         self._gather_turns_left = value
 
     @hybrid_property
     def gathered_seawater_today(self):
-        self._check_daily_reset()
-        return self._gathered_seawater_today
+        return DAILY_RESET_VALUES['_gathered_seawater_today'] if self._is_reset_due() else self._gathered_seawater_today
 
     @gathered_seawater_today.setter
     def gathered_seawater_today(self, value):
+        self._check_daily_reset()
         self._gathered_seawater_today = value
 
+    @property
+    def water_now(self):
+        return water_remaining(self)
+
+
+
+# Typed game events. Their rows keep log_message empty; game_events renders the sentence.
+GAME_EVENT_KINDS = ('move', 'search', 'gather', 'trap', 'combat', 'transfer', 'teleport', 'elimination')
 
 
 class GameLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_game_log_room_id_privacy_timestamp', 'room_id', 'privacy', 'timestamp'),
+        db.Index('ix_game_log_room_id_team_id_privacy_timestamp', 'room_id', 'team_id', 'privacy', 'timestamp'),
+        db.Index('ix_game_log_room_id_kind_timestamp', 'room_id', 'kind', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     log_message = db.Column(db.String(500))
 
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
-    user = db.relationship('User')
+    user = db.relationship('User', foreign_keys=[user_id])
+
+    # Event fields, all empty on free-text rows.
+    kind = db.Column(db.Enum(*GAME_EVENT_KINDS, name='game_event_kind', native_enum=False), nullable=True)
+    detail = db.Column(db.String(20), nullable=True)     # outcome or herb code, e.g. 'duel_win', 'quynh_tam'
+    target_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    target = db.relationship('User', foreign_keys=[target_user_id])
+    square = db.Column(db.String(5), nullable=True)
+    from_square = db.Column(db.String(5), nullable=True)
+    amount = db.Column(db.Float, nullable=True)
 
 
     room_id = db.Column(db.Integer, db.ForeignKey('game_room.id'), nullable=True)
@@ -186,6 +217,10 @@ class GameLog(db.Model):
 
 
 class Notification(db.Model):
+    __table_args__ = (
+        db.Index('ix_notification_user_id_is_read_timestamp', 'user_id', 'is_read', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
@@ -201,6 +236,10 @@ class Notification(db.Model):
 
 
 class GameChat(db.Model):
+    __table_args__ = (
+        db.Index('ix_game_chat_room_id_scope_team_id_timestamp', 'room_id', 'scope', 'team_id', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     message_body = db.Column(db.String(500), nullable=False)
@@ -215,6 +254,37 @@ class GameChat(db.Model):
     team_id = db.Column(db.String(10), nullable=True)
 
 
+class MovementEvent(db.Model):
+    __table_args__ = (
+        db.Index('ix_movement_event_room_id_user_id_timestamp', 'room_id', 'user_id', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    timestamp = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user = db.relationship('User')
+
+    room_id = db.Column(db.Integer, db.ForeignKey('game_room.id'), nullable=False)
+
+    from_square = db.Column(db.String(5))
+    to_square = db.Column(db.String(5))
+
+    method = db.Column(db.String(20), default='move')   # 'move' or 'teleport'
+
+
+class HerbSpawn(db.Model):
+    __table_args__ = (
+        db.Index('ix_herb_spawn_room_id_square', 'room_id', 'square', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('game_room.id'), nullable=False)
+    square = db.Column(db.String(5), nullable=False)
+    herb_code = db.Column(db.String(20), nullable=False)
+    spawn_date = db.Column(db.Date, nullable=False)
+
+
 #QUAN TRỌNG: MỖI LẦN SỬA FILE NÀY HÃY CHẠY 4 LỆNH NÀY TRONG TERMINAL
 #b1 cd App
 #b2 $env:FLASK_APP = "website"
@@ -0,0 +1,105 @@
+import os
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PlotCache:
+    """Bounded LRU cache of base64 PNG plots, optionally persisted to disk.
+
+    Keys are tuples of already validated coordinates, e.g. ('time', '3g7', '4j10').
+    The files on disk are named by the sha256 of the key, so any process pointing at
+    the same folder shares the same images.
+    """
+
+    def __init__(self, max_entries=512, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_entries=None, cache_dir=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            self.cache_dir = cache_dir
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            self._evict()
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _store(self, key, data):
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+            if self.cache_dir:
+                try:
+                    with open(self._path(key), 'rb') as f:
+                        data = base64.b64encode(f.read()).decode("ascii")
+                except OSError:
+                    data = None
+                if data is not None:
+                    self.disk_hits += 1
+                    self._store(key, data)
+                    return data
+
+            self.misses += 1
+            return None
+
+    def put(self, key, data):
+        with self._lock:
+            self._store(key, data)
+            if self.cache_dir:
+                try:
+                    with open(self._path(key), 'wb') as f:
+                        f.write(base64.b64decode(data))
+                except OSError as e:
+                    print(f"Error while writing plot cache file: {e}")
+
+    def get_or_render(self, key, render):
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'persistent': bool(self.cache_dir)
+            }
+
+
+plot_cache = PlotCache()
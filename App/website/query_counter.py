@@ -0,0 +1,163 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from . import db
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def get_query_count():
+    return g.get('query_count', 0)
+
+
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    if has_request_context():
+        g.sql_time = g.get('sql_time', 0.0) + elapsed
+        if elapsed * 1000 >= request_profiler.slow_query_ms:
+            g.setdefault('slow_queries', []).append((round(elapsed * 1000, 2), ' '.join(statement.split())[:300]))
+
+
+def _count_commit(conn):
+    if has_request_context():
+        g.commit_count = g.get('commit_count', 0) + 1
+
+
+@contextmanager
+def profile_render():
+    """Add the time spent in the block to the request's map render time."""
+    if not request_profiler.enabled or not has_request_context():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.render_time = g.get('render_time', 0.0) + time.perf_counter() - started
+
+
+class RequestProfiler:
+    """Queries, SQL time, map render time and commits per endpoint and dashboard action.
+
+    Off by default; the cursor and commit listeners are only installed when PROFILER_ENABLED is on.
+    """
+
+    def __init__(self, slow_query_limit=50):
+        self.enabled = False
+        self.log = False
+        self.slow_query_ms = 100
+        self._stats = {}
+        self._slow_queries = deque(maxlen=slow_query_limit)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=False, log=False, slow_query_ms=100):
+        self.enabled = enabled
+        self.log = log
+        self.slow_query_ms = slow_query_ms
+
+    def record(self, endpoint, action, elapsed, queries, sql_time, render_time, commits, slow_queries):
+        with self._lock:
+            entry = self._stats.setdefault((endpoint, action), {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'commits': 0,
+                'total_time': 0.0, 'sql_time': 0.0, 'render_time': 0.0,
+            })
+            entry['requests'] += 1
+            entry['queries'] += queries
+            entry['max_queries'] = max(entry['max_queries'], queries)
+            entry['commits'] += commits
+            entry['total_time'] += elapsed
+            entry['sql_time'] += sql_time
+            entry['render_time'] += render_time
+            for ms, statement in slow_queries:
+                self._slow_queries.append({'endpoint': endpoint, 'action': action, 'ms': ms, 'statement': statement})
+
+    def stats(self):
+        with self._lock:
+            endpoints = []
+            for (endpoint, action), entry in sorted(self._stats.items(), key=lambda item: (item[0][0] or '', item[0][1] or '')):
+                count = entry['requests']
+                endpoints.append({
+                    'endpoint': endpoint,
+                    'action': action,
+                    'requests': count,
+                    'avg_queries': round(entry['queries'] / count, 2),
+                    'max_queries': entry['max_queries'],
+                    'avg_commits': round(entry['commits'] / count, 2),
+                    'avg_ms': round(entry['total_time'] / count * 1000, 2),
+                    'avg_sql_ms': round(entry['sql_time'] / count * 1000, 2),
+                    'avg_render_ms': round(entry['render_time'] / count * 1000, 2),
+                })
+            return {'enabled': self.enabled, 'endpoints': endpoints, 'slow_queries': list(self._slow_queries)}
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+
+
+request_profiler = RequestProfiler()
+
+
+def init_query_counter(app):
+    """Count SQL statements per request; with QUERY_COUNT_HEADER on, report them in X-Query-Count.
+
+    With PROFILER_ENABLED on, also time every statement and commit and keep the totals per
+    endpoint and action for /api/profiler_stats; PROFILER_LOG prints one JSON line per request.
+    """
+    request_profiler.configure(enabled=app.config.get('PROFILER_ENABLED', False),
+                               log=app.config.get('PROFILER_LOG', False),
+                               slow_query_ms=app.config.get('PROFILER_SLOW_QUERY_MS', 100))
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_query)
+        if request_profiler.enabled:
+            event.listen(db.engine, 'before_cursor_execute', _start_query)
+            event.listen(db.engine, 'after_cursor_execute', _end_query)
+            event.listen(db.engine, 'commit', _count_commit)
+
+    @app.before_request
+    def start_profile():
+        if request_profiler.enabled:
+            g.profile_start = time.perf_counter()
+
+    @app.after_request
+    def add_query_count_header(response):
+        if app.config.get('QUERY_COUNT_HEADER'):
+            response.headers['X-Query-Count'] = str(get_query_count())
+        if request_profiler.enabled and 'profile_start' in g:
+            record_profile(response)
+        return response
+
+
+def record_profile(response):
+    action = request.form.get('action') if request.method == 'POST' and request.form else None
+    elapsed = time.perf_counter() - g.profile_start
+    sql_time = g.get('sql_time', 0.0)
+    render_time = g.get('render_time', 0.0)
+    slow_queries = g.get('slow_queries', [])
+    request_profiler.record(request.endpoint, action, elapsed, get_query_count(), sql_time,
+                            render_time, g.get('commit_count', 0), slow_queries)
+    if request_profiler.log:
+        print(json.dumps({
+            'endpoint': request.endpoint,
+            'action': action,
+            'method': request.method,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 2),
+            'queries': get_query_count(),
+            'sql_ms': round(sql_time * 1000, 2),
+            'render_ms': round(render_time * 1000, 2),
+            'commits': g.get('commit_count', 0),
+            'slow_queries': [ms for ms, statement in slow_queries],
+        }))
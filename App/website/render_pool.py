@@ -0,0 +1,141 @@
+import atexit
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from .map_cache import map_tiles
+
+
+def _init_worker(tile_dir):
+    map_tiles.configure(cache_dir=tile_dir)
+
+
+def _render(beast_squares, markers, tile_key):
+    # Imported here so matplotlib only loads in processes that actually draw maps.
+    from .map_render import render_game_map_png
+    return render_game_map_png(beast_squares, markers, tile_key)
+
+
+class RenderPool:
+    """Renders game map PNGs in worker processes, so request threads only wait for them.
+
+    A request waits at most `timeout` seconds. If the image is not ready by then, the
+    player gets the last map rendered for them (with that map's ETag, so the browser asks
+    again) and the late image is kept for the next request. A player with no map yet waits
+    up to `first_timeout` seconds in all; after that render() returns (None, None).
+    With no workers, maps are rendered in the request thread as before.
+    """
+
+    def __init__(self, workers=0, timeout=2.0, first_timeout=10.0, max_entries=256):
+        self.workers = workers
+        self.timeout = timeout
+        self.first_timeout = first_timeout
+        self.max_entries = max_entries
+        self._executor = None
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+        self.rendered = 0
+        self.reused = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+
+    def configure(self, workers=None, timeout=None, first_timeout=None):
+        with self._lock:
+            if workers is not None:
+                self.workers = workers
+            if timeout is not None:
+                self.timeout = timeout
+            if first_timeout is not None:
+                self.first_timeout = first_timeout
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: forking a process that already runs request threads is unsafe.
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker, initargs=(map_tiles.cache_dir,))
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _remember(self, owner, etag, png):
+        with self._lock:
+            self._last[owner] = (png, etag)
+            self._last.move_to_end(owner)
+            while len(self._last) > self.max_entries:
+                self._last.popitem(last=False)
+
+    def _previous(self, owner):
+        with self._lock:
+            return self._last.get(owner)
+
+    def render(self, owner, etag, beast_squares, markers, tile_key=None):
+        """(png, etag) of the map for `owner`; the etag differs from the one asked for on a fallback.
+
+        (None, None) when there is nothing to show within the deadline.
+        """
+        previous = self._previous(owner)
+        if previous is not None and previous[1] == etag:
+            self.reused += 1
+            return previous
+
+        if not self.workers:
+            png = _render(beast_squares, markers, tile_key)
+            self.rendered += 1
+            self._remember(owner, etag, png)
+            return png, etag
+
+        try:
+            future = self._get_executor().submit(_render, beast_squares, markers, tile_key)
+            future.add_done_callback(lambda f: self._keep_late_image(f, owner, etag))
+            try:
+                png = future.result(timeout=self.timeout)
+            except TimeoutError:
+                if previous is not None:
+                    self.fallbacks += 1
+                    return previous
+                # Nothing to show yet, so this one is worth waiting for, but not forever.
+                try:
+                    png = future.result(timeout=max(self.first_timeout - self.timeout, 0))
+                except TimeoutError:
+                    self.timeouts += 1
+                    return None, None
+        except BrokenProcessPool as e:
+            print(f"Map render worker died, rendering in process: {e}")
+            self._reset_executor()
+            png = _render(beast_squares, markers, tile_key)
+
+        self.rendered += 1
+        self._remember(owner, etag, png)
+        return png, etag
+
+    def _keep_late_image(self, future, owner, etag):
+        if not future.cancelled() and future.exception() is None:
+            self._remember(owner, etag, future.result())
+
+    def shutdown(self):
+        self._reset_executor()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'timeout': self.timeout,
+                'first_timeout': self.first_timeout,
+                'entries': len(self._last),
+                'rendered': self.rendered,
+                'reused': self.reused,
+                'fallbacks': self.fallbacks,
+                'timeouts': self.timeouts
+            }
+
+
+render_pool = RenderPool()
+atexit.register(render_pool.shutdown)
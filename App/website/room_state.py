@@ -0,0 +1,282 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from . import db
+from .models import GameRoom, PlayerState, User, DAILY_RESET_VALUES, daily_reset_due
+from .water import water_remaining
+
+
+ROOM_FIELDS = tuple(attr.key for attr in GameRoom.__mapper__.column_attrs)
+PLAYER_FIELDS = tuple(attr.key for attr in PlayerState.__mapper__.column_attrs)
+
+# Marks a committed row we could not copy; the room holding it is dropped and reloaded.
+RELOAD = object()
+
+
+class UserSnapshot:
+    __slots__ = ('id', 'first_name')
+
+    def __init__(self, id, first_name):
+        self.id = id
+        self.first_name = first_name
+
+
+class RoomSnapshot:
+    """One active GameRoom with its players (user_id -> PlayerSnapshot), guarded by its own lock."""
+    __slots__ = ROOM_FIELDS + ('players', 'lock')
+
+    def __init__(self, values):
+        for key in ROOM_FIELDS:
+            setattr(self, key, values.get(key))
+        self.players = {}
+        self.lock = threading.RLock()
+
+
+class PlayerSnapshot:
+    """Read-only stand-in for a PlayerState row; templates and map code read it the same way."""
+    __slots__ = PLAYER_FIELDS + ('user', 'room')
+
+    def __init__(self, values, user, room):
+        for key in PLAYER_FIELDS:
+            setattr(self, key, values.get(key))
+        self.user = user
+        self.room = room
+
+    def _is_reset_due(self):
+        # Same rule as PlayerState, which never writes from its getters either.
+        return daily_reset_due(self._last_detect_reset)
+
+    @property
+    def detect_turns_left(self):
+        return DAILY_RESET_VALUES['_detect_turns_left'] if self._is_reset_due() else self._detect_turns_left
+
+    @property
+    def take_water_turns_left(self):
+        return DAILY_RESET_VALUES['_take_water_turns_left'] if self._is_reset_due() else self._take_water_turns_left
+
+    @property
+    def gather_turns_left(self):
+        return DAILY_RESET_VALUES['_gather_turns_left'] if self._is_reset_due() else self._gather_turns_left
+
+    @property
+    def gathered_seawater_today(self):
+        return DAILY_RESET_VALUES['_gathered_seawater_today'] if self._is_reset_due() else self._gathered_seawater_today
+
+    @property
+    def water_now(self):
+        return water_remaining(self)
+
+
+def _column_values(obj, fields):
+    return {key: getattr(obj, key) for key in fields}
+
+
+class RoomStateEngine:
+    """Optional in-process copy of active rooms and their players.
+
+    Read-through only, not write-behind. Reads come from memory; every ORM commit that
+    touches a GameRoom, PlayerState or User is applied to the copy after it lands, so the
+    database stays the source of truth. Write-behind was dropped: its only frequent write
+    was the water tick, which water.py now works out from the last action when it is
+    read, and queueing the rest (actions, eliminations) would lose them on a crash for
+    no gain, since an action already costs one commit.
+
+    Only meant for a single worker process: other processes' commits are not seen.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._rooms = {}
+        self._user_rooms = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=False):
+        self.enabled = enabled
+
+    def _load_room(self, room_id):
+        room = db.session.get(GameRoom, room_id)
+        if room is None:
+            return None
+        snapshot = RoomSnapshot(_column_values(room, ROOM_FIELDS))
+        players = PlayerState.query.options(joinedload(PlayerState.user)).filter_by(room_id=room_id).all()
+        for player in players:
+            user = UserSnapshot(player.user.id, player.user.first_name) if player.user else None
+            snapshot.players[player.user_id] = PlayerSnapshot(_column_values(player, PLAYER_FIELDS), user, snapshot)
+
+        with self._lock:
+            existing = self._rooms.get(room_id)
+            if existing is not None:
+                return existing
+            self._rooms[room_id] = snapshot
+            for user_id in snapshot.players:
+                self._user_rooms[user_id] = room_id
+        return snapshot
+
+    def get_room(self, room_id):
+        with self._lock:
+            room = self._rooms.get(room_id)
+        return room if room is not None else self._load_room(room_id)
+
+    def get_player(self, user_id):
+        """(room, player) for the user, loading the room on first use; (None, None) if not in a game."""
+        with self._lock:
+            room_id = self._user_rooms.get(user_id)
+        if room_id is None:
+            state = PlayerState.query.filter_by(user_id=user_id).first()
+            if state is None:
+                return None, None
+            room_id = state.room_id
+        room = self.get_room(room_id)
+        if room is None:
+            return None, None
+        return room, room.players.get(user_id)
+
+    def players(self, room_id):
+        room = self.get_room(room_id)
+        if room is None:
+            return []
+        with room.lock:
+            return list(room.players.values())
+
+    def _drop_room(self, room_id):
+        room = self._rooms.pop(room_id, None)
+        if room is None:
+            return
+        for user_id in room.players:
+            self._user_rooms.pop(user_id, None)
+
+    def forget_room(self, room_id):
+        """Drop a room changed outside the ORM (bulk UPDATEs); it is reloaded on the next read."""
+        with self._lock:
+            self._drop_room(room_id)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._user_rooms.clear()
+
+    def apply_committed(self, changes):
+        """Copy rows a transaction just committed into the rooms we hold.
+
+        Locks are always taken room first, engine second.
+        """
+        for (model, key), values in changes.items():
+            if model is GameRoom:
+                self._apply_room(key, values)
+            elif model is PlayerState:
+                self._apply_player(key, values)
+            elif model is User and values not in (None, RELOAD):
+                with self._lock:
+                    players = [room.players.get(key) for room in self._rooms.values()]
+                for player in players:
+                    if player is not None and player.user is not None:
+                        player.user.first_name = values['first_name']
+
+    def _apply_room(self, room_id, values):
+        with self._lock:
+            if values is None or values is RELOAD:
+                self._drop_room(room_id)
+                return
+            room = self._rooms.get(room_id)
+        if room is not None:
+            with room.lock:
+                for field in ROOM_FIELDS:
+                    setattr(room, field, values[field])
+
+    def _apply_player(self, player_id, values):
+        if values is None or values is RELOAD:
+            with self._lock:
+                rooms = list(self._rooms.values())
+            for room in rooms:
+                with room.lock:
+                    for user_id, player in list(room.players.items()):
+                        if player.id == player_id:
+                            with self._lock:
+                                if values is RELOAD:
+                                    self._drop_room(room.id)
+                                else:
+                                    del room.players[user_id]
+                                    self._user_rooms.pop(user_id, None)
+            return
+
+        user_id = values['user_id']
+        with self._lock:
+            old_room_id = self._user_rooms.get(user_id)
+            if old_room_id is not None and old_room_id != values['room_id']:
+                self._drop_room(old_room_id)
+            room = self._rooms.get(values['room_id'])
+        if room is None:
+            return
+
+        with room.lock:
+            player = room.players.get(user_id)
+            if player is None:
+                # A new player: reload the room on the next read so names come with it.
+                with self._lock:
+                    self._drop_room(room.id)
+                return
+            for field in PLAYER_FIELDS:
+                setattr(player, field, values[field])
+
+
+room_state = RoomStateEngine()
+
+
+def _loaded_values(obj, fields):
+    # Only what is already in memory: loading from inside a flush event is not allowed.
+    values = obj.__dict__
+    if all(key in values for key in fields):
+        return {key: values[key] for key in fields}
+    return RELOAD
+
+
+def _collect_room_changes(session, flush_context):
+    if not room_state.enabled:
+        return
+    changes = session.info.setdefault('room_state_changes', {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, GameRoom):
+            changes[(GameRoom, obj.id)] = _loaded_values(obj, ROOM_FIELDS)
+        elif isinstance(obj, PlayerState):
+            values = _loaded_values(obj, PLAYER_FIELDS)
+            changes[(PlayerState, obj.id)] = values
+            if values is RELOAD or obj in session.new:
+                # A new row lacks its unset nullable columns, so it cannot be copied: the
+                # room it joined is reloaded instead.
+                session.info.setdefault('room_state_reload', set()).add(obj.__dict__.get('room_id'))
+        elif isinstance(obj, User):
+            changes[(User, obj.id)] = _loaded_values(obj, ('first_name',))
+    for obj in session.deleted:
+        if isinstance(obj, (GameRoom, PlayerState)):
+            changes[(type(obj), obj.id)] = None
+
+
+def _apply_room_changes(session):
+    changes = session.info.pop('room_state_changes', None)
+    reload_rooms = session.info.pop('room_state_reload', None)
+    if not room_state.enabled:
+        return
+    if changes:
+        room_state.apply_committed(changes)
+    for room_id in reload_rooms or ():
+        room_state.forget_room(room_id)
+
+
+def _forget_room_changes(session):
+    session.info.pop('room_state_changes', None)
+    session.info.pop('room_state_reload', None)
+
+
+_hooks_registered = False
+
+
+def init_room_state(app):
+    global _hooks_registered
+    room_state.configure(enabled=app.config.get('ROOM_STATE_ENGINE', False))
+    if _hooks_registered:
+        return
+    event.listen(db.session, 'after_flush', _collect_room_changes)
+    event.listen(db.session, 'after_commit', _apply_room_changes)
+    event.listen(db.session, 'after_rollback', _forget_room_changes)
+    _hooks_registered = True
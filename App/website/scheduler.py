@@ -0,0 +1,176 @@
+import time
+import random
+import threading
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import update, or_
+
+from . import db
+from .models import GameRoom, PlayerState, DAILY_RESET_VALUES
+from .board import HERBS_LOCATIONS_POOL
+from .room_state import room_state
+from .herbs import replace_room_herbs
+
+
+VIETNAM_TZ_OFFSET = timedelta(hours=7)
+
+HERB_SPAWN_CONFIG = {
+    'tuong_tu': 2,
+    'thuong_quan': 2,
+    'phan_thien': 2,
+    'quynh_tam': 1,
+    'ly_sau': 4,
+    'nhat_nguyet': 2,
+    'u_tam': 4
+}
+
+# Trầm Tương appears on 3g7 at a random minute of this evening window.
+TRAM_TUONG_WINDOW_HOURS = (20, 22)
+
+
+def vietnam_today(now=None):
+    return ((now or datetime.now(timezone.utc)) + VIETNAM_TZ_OFFSET).date()
+
+
+def roll_herb_mapping():
+    """A fresh {square: herb_code} spawn drawn from the herb spot pool."""
+    available_spots = list(HERBS_LOCATIONS_POOL)
+    random.shuffle(available_spots)
+
+    new_mapping = {}
+    for herb_code, count in HERB_SPAWN_CONFIG.items():
+        for _ in range(count):
+            if available_spots:
+                spot = available_spots.pop()
+                new_mapping[spot] = herb_code
+    return new_mapping
+
+
+def tram_tuong_spawned(room, now=None):
+    now_vietnam = (now or datetime.now(timezone.utc)) + VIETNAM_TZ_OFFSET
+    start_hour, end_hour = TRAM_TUONG_WINDOW_HOURS
+    if not (start_hour <= now_vietnam.hour < end_hour):
+        return False
+    if room.tram_tuong_herb_day != now_vietnam.date() or room.tram_tuong_herb_minute is None:
+        return False
+    return (now_vietnam.hour - start_hour) * 60 + now_vietnam.minute >= room.tram_tuong_herb_minute
+
+
+def spawn_daily_herbs(today):
+    """New herbs for every room not spawned yet today. Each UPDATE re-checks the date, so two runs never both win."""
+    not_spawned = or_(GameRoom.daily_herb_spawn_date.is_(None), GameRoom.daily_herb_spawn_date != today)
+    spawned = []
+    for (room_id,) in db.session.query(GameRoom.id).filter(not_spawned).all():
+        result = db.session.execute(
+            update(GameRoom)
+            .where(GameRoom.id == room_id, not_spawned)
+            .values(daily_herb_spawn_date=today)
+        )
+        if result.rowcount:
+            replace_room_herbs(room_id, today, roll_herb_mapping())
+            spawned.append(room_id)
+    return spawned
+
+
+def roll_tram_tuong(today):
+    not_rolled = or_(GameRoom.tram_tuong_herb_day.is_(None), GameRoom.tram_tuong_herb_day != today)
+    rolled = []
+    for (room_id,) in db.session.query(GameRoom.id).filter(not_rolled).all():
+        result = db.session.execute(
+            update(GameRoom)
+            .where(GameRoom.id == room_id, not_rolled)
+            .values(tram_tuong_herb_day=today, tram_tuong_herb_minute=random.randint(0, 119))
+        )
+        if result.rowcount:
+            rolled.append(room_id)
+    return rolled
+
+
+def reset_daily_turns(today, now):
+    """Reset the daily turn counters of every player last reset before today's Vietnam midnight (or never), in one UPDATE."""
+    midnight_utc = datetime(today.year, today.month, today.day, tzinfo=timezone.utc) - VIETNAM_TZ_OFFSET
+    values = {getattr(PlayerState, key): value for key, value in DAILY_RESET_VALUES.items()}
+    values[PlayerState._last_detect_reset] = now
+    result = db.session.execute(
+        update(PlayerState)
+        .where(or_(PlayerState._last_detect_reset.is_(None), PlayerState._last_detect_reset < midnight_utc))
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def run_daily_transitions(now=None):
+    """The Vietnam-midnight and 20:00 transitions for all rooms. Safe to run as often as you like."""
+    now = now or datetime.now(timezone.utc)
+    today = vietnam_today(now)
+    is_window_active = TRAM_TUONG_WINDOW_HOURS[0] <= (now + VIETNAM_TZ_OFFSET).hour < TRAM_TUONG_WINDOW_HOURS[1]
+
+    try:
+        spawned = spawn_daily_herbs(today)
+        rolled = roll_tram_tuong(today) if is_window_active else []
+        reset = reset_daily_turns(today, now)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error running daily transitions: {e}")
+        return
+
+    for room_id in set(spawned + rolled):
+        room_state.forget_room(room_id)
+    if spawned:
+        print(f"Daily herbs spawned for {today} in {len(spawned)} room(s).")
+    if rolled:
+        print(f"'Trầm Tương' herb rolled for {today} in {len(rolled)} room(s).")
+    if reset:
+        print(f"Daily turns reset for {reset} player(s).")
+
+
+def scheduled_jobs(app):
+    from .game_engine.rules import sweep_thirst
+    return [
+        (app.config['DAILY_TRANSITIONS_SECONDS'], run_daily_transitions),
+        (app.config['THIRST_SWEEP_SECONDS'], sweep_thirst)
+    ]
+
+
+def run_scheduler(app, stop=None):
+    """Run every job once, then again each time its interval passes. Jobs with interval 0 are off."""
+    jobs = [(interval, job) for interval, job in scheduled_jobs(app) if interval]
+    if not jobs:
+        return
+    stop = stop or threading.Event()
+    next_run = [0.0] * len(jobs)
+    while True:
+        for i, (interval, job) in enumerate(jobs):
+            if time.monotonic() < next_run[i]:
+                continue
+            try:
+                with app.app_context():
+                    job()
+            except Exception as e:
+                print(f"Error in scheduled job {job.__name__}: {e}")
+            next_run[i] = time.monotonic() + interval
+        if stop.wait(max(0.0, min(next_run) - time.monotonic())):
+            return
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def init_scheduler(app):
+    """Start the scheduler with the first request, or run it on its own with 'flask run-scheduler'."""
+    @app.cli.command('run-scheduler')
+    def run_scheduler_command():
+        """Run the daily transitions and the thirst sweep in the foreground."""
+        run_scheduler(app)
+
+    @app.before_request
+    def start_scheduler():
+        global _scheduler
+        if _scheduler is not None or not app.config['SCHEDULER_ENABLED']:
+            return
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = threading.Thread(target=run_scheduler, args=(app,), name='scheduler', daemon=True)
+                _scheduler.start()
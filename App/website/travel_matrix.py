@@ -0,0 +1,204 @@
+import os
+import threading
+import numpy as np
+
+from .board import PARTIAL_SQUARES, MAIN_SQUARES, D_HARD, T_HARD
+from .water import WATER_PER_HOUR
+
+
+SQUARE_CODES = list(PARTIAL_SQUARES)
+SQUARE_INDEX = {code: i for i, code in enumerate(SQUARE_CODES)}
+
+MAIN_SQUARE_CODES = list(MAIN_SQUARES)
+MAIN_SQUARE_BITS = {code: 1 << i for i, code in enumerate(MAIN_SQUARE_CODES)}
+
+# Bump when the formula or the square order changes so old .npy files are rebuilt.
+MATRIX_VERSION = 1
+
+
+def build_matrices():
+    """(travel_time, water_cost) as 400x400 float arrays, indexed like SQUARE_CODES.
+
+    travel_time is the same t_out as time_calculator_main. water_cost is rounded to
+    2 decimals with Python's round(), exactly like the move action charged it.
+    """
+    centres = np.array([(sq.X, sq.Y) for sq in PARTIAL_SQUARES.values()])
+    dX = centres[None, :, 0] - centres[:, None, 0]
+    dY = centres[None, :, 1] - centres[:, None, 1]
+    travel_time = T_HARD * (np.sqrt(dX**2 + dY**2) / D_HARD)
+
+    water_cost = np.array([round(t / 3600 * WATER_PER_HOUR, 2) for t in travel_time.ravel().tolist()])
+    return travel_time, water_cost.reshape(travel_time.shape)
+
+
+def segments_hit_squares(start_X, start_Y, start_x, start_y, end_X, end_Y, end_x, end_y, x3, y3, X3, Y3):
+    """Vectorized segment_hits_square: all arguments are arrays that broadcast together.
+
+    Every operation is the same float operation in the same order as the scalar version,
+    so the results are identical, not just close.
+    """
+    X1, Y1, x1, y1 = start_X, start_Y, start_x, start_y
+    X2, Y2, x2, y2 = end_X, end_Y, end_x, end_y
+
+    a = (Y2 - Y1)*(x3 - 1 - X1) - (X2 - X1)*(y3 - 1 - Y1)
+    b = (Y2 - Y1)*(x3 - X1) - (X2 - X1)*(y3 - 1 - Y1)
+    c = (Y2 - Y1)*(x3 - 1 - X1) - (X2 - X1)*(y3 - Y1)
+    d = (Y2 - Y1)*(x3 - X1) - (X2 - X1)*(y3 - Y1)
+
+    X_low_limit = np.where(X1 < X2, x1 - 1, x2 - 1)
+    X_high_limit = np.where(X1 < X2, x2, x1)
+    Y_low_limit = np.where(Y1 > Y2, y1, y2)
+    Y_high_limit = np.where(Y1 > Y2, y2 - 1, y1 - 1)
+
+    miss = (((a > 0) & (b > 0) & (c > 0) & (d > 0)) | ((a < 0) & (b < 0) & (c < 0) & (d < 0))
+            | (X3 < X_low_limit) | (X3 > X_high_limit) | (Y3 > Y_low_limit) | (Y3 < Y_high_limit))
+    return ~miss
+
+
+def _square_arrays(codes):
+    squares = [PARTIAL_SQUARES[code] for code in codes]
+    return (np.array([sq.X for sq in squares]), np.array([sq.Y for sq in squares]),
+            np.array([sq.x for sq in squares]), np.array([sq.y for sq in squares]))
+
+
+def build_crossing_index():
+    """400x400x2 uint64: bit k of the 128-bit value is set if the move i -> j crosses main square k.
+
+    Same test as check_main_square_intersection (segment_hits_square at the main square
+    centre), evaluated for every pair at once, one main square at a time.
+    """
+    X, Y, x, y = _square_arrays(SQUARE_CODES)
+    start = (X[:, None], Y[:, None], x[:, None], y[:, None])
+    end = (X[None, :], Y[None, :], x[None, :], y[None, :])
+
+    index = np.zeros((len(SQUARE_CODES), len(SQUARE_CODES), 2), dtype=np.uint64)
+    for k, (x3, y3) in enumerate(MAIN_SQUARES.values()):
+        hit = segments_hit_squares(*start, *end, x3, y3, x3 - 0.5, y3 - 0.5)
+        index[:, :, k // 64] |= hit.astype(np.uint64) << np.uint64(k % 64)
+    return index
+
+
+def batch_violence_detector(moves, observers):
+    """Violence test for every (move, observer) pair in one vectorized pass.
+
+    moves: list of (start, end) partial-square codes. observers: list of partial-square codes.
+    Returns a len(moves) x len(observers) bool array, the same as
+    violence_detector_main(start, end, observer)['result'] == "Violence occurs".
+    Raises ValueError listing the invalid codes.
+    """
+    invalid = sorted({code for move in moves for code in move if code not in SQUARE_INDEX}
+                     | {code for code in observers if code not in SQUARE_INDEX}, key=str)
+    if invalid:
+        raise ValueError(f"Invalid coordinate(s): {', '.join(map(str, invalid))}")
+
+    X1, Y1, x1, y1 = _square_arrays([start for start, _ in moves])
+    X2, Y2, x2, y2 = _square_arrays([end for _, end in moves])
+    X3, Y3, x3, y3 = _square_arrays(observers)
+
+    return segments_hit_squares(
+        X1[:, None], Y1[:, None], x1[:, None], y1[:, None],
+        X2[:, None], Y2[:, None], x2[:, None], y2[:, None],
+        x3[None, :], y3[None, :], X3[None, :], Y3[None, :]
+    )
+
+
+def main_square_mask(main_squares):
+    """Bitmask of the given main squares, in the same bit order as the crossing index."""
+    mask = 0
+    for code in main_squares:
+        mask |= MAIN_SQUARE_BITS.get(code, 0)
+    return mask
+
+
+class TravelMatrix:
+
+    def __init__(self):
+        self.travel_time = None
+        self.water_cost = None
+        self.crossing_index = None
+        self._lock = threading.Lock()
+        self._load_once = threading.Lock()
+        self.seawater_mask = np.array([sq.is_seawater for sq in PARTIAL_SQUARES.values()])
+
+    def _load_array(self, cache_dir, name, build, shape):
+        cache_path = os.path.join(cache_dir, f"{name}_v{MATRIX_VERSION}.npy") if cache_dir else None
+        array = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                array = np.load(cache_path, mmap_mode='r')
+                if array.shape != shape:
+                    array = None
+            except (OSError, ValueError) as e:
+                print(f"Error while loading {name} cache: {e}")
+                array = None
+
+        if array is None:
+            array = build()
+            if cache_path:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    np.save(cache_path, array)
+                except OSError as e:
+                    print(f"Error while saving {name} cache: {e}")
+        return array
+
+    def load(self, cache_dir=None):
+        """Load the matrices, memory-mapped from .npy files in cache_dir when there are valid ones."""
+        size = len(SQUARE_CODES)
+        with self._lock:
+            matrices = self._load_array(cache_dir, 'travel_matrix', lambda: np.stack(build_matrices()), (2, size, size))
+            crossing_index = self._load_array(cache_dir, 'crossing_index', build_crossing_index, (size, size, 2))
+            self.water_cost, self.crossing_index = matrices[1], crossing_index
+            # Set last: readers take a non-None travel_time to mean everything is loaded.
+            self.travel_time = matrices[0]
+
+    def ensure_loaded(self, cache_dir=None):
+        if self.travel_time is None:
+            with self._load_once:
+                if self.travel_time is None:
+                    self.load(cache_dir)
+
+    def _ensure_loaded(self):
+        self.ensure_loaded()
+
+    def get_travel_time(self, start, end):
+        """Seconds from start to end, or None if either code is invalid."""
+        i = SQUARE_INDEX.get(start)
+        j = SQUARE_INDEX.get(end)
+        if i is None or j is None:
+            return None
+        self._ensure_loaded()
+        return float(self.travel_time[i, j])
+
+    def get_water_cost(self, start, end):
+        """Water bars a move from start to end costs, or None if either code is invalid."""
+        i = SQUARE_INDEX.get(start)
+        j = SQUARE_INDEX.get(end)
+        if i is None or j is None:
+            return None
+        self._ensure_loaded()
+        return float(self.water_cost[i, j])
+
+    def reachable_squares(self, start, water, include_seawater=False):
+        """Every square a move from start can reach spending at most `water` bars."""
+        i = SQUARE_INDEX.get(start)
+        if i is None:
+            return []
+        self._ensure_loaded()
+        mask = self.water_cost[i] <= water
+        if not include_seawater:
+            mask &= ~self.seawater_mask
+        return [SQUARE_CODES[j] for j in np.flatnonzero(mask)]
+
+    def crossed_main_squares(self, start, end):
+        """Bitmask of the main squares the move start -> end crosses (0 if a code is invalid)."""
+        i = SQUARE_INDEX.get(start)
+        j = SQUARE_INDEX.get(end)
+        if i is None or j is None:
+            return 0
+        self._ensure_loaded()
+        low, high = self.crossing_index[i, j]
+        return int(low) | (int(high) << 64)
+
+
+travel_matrix = TravelMatrix()
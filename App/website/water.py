@@ -0,0 +1,67 @@
+from datetime import datetime, timezone, timedelta
+
+
+# Water bars lost per hour of being alive.
+WATER_PER_HOUR = 1.0 / 6.0
+
+VIETNAM_TZ_OFFSET = timedelta(hours=7)
+
+# A Seeker idling on the cursed square during the evening window drinks three times as fast.
+CURSED_SQUARE = '3g7'
+CURSE_WINDOW_HOURS = (20, 22)
+CURSE_GRACE = timedelta(minutes=15)
+CURSE_MULTIPLIER = 3.0
+
+
+def _as_utc(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _curse_seconds(state, start, end):
+    """Seconds of [start, end] spent under the 3g7 curse, for the state's current square and role."""
+    if state.role != 'Seeker' or state.current_location != CURSED_SQUARE:
+        return 0.0
+
+    if state.last_active_post_time is not None:
+        start = max(start, _as_utc(state.last_active_post_time) + CURSE_GRACE)
+    if end <= start:
+        return 0.0
+
+    total = 0.0
+    day = (start + VIETNAM_TZ_OFFSET).date()
+    last_day = (end + VIETNAM_TZ_OFFSET).date()
+    while day <= last_day:
+        midnight_utc = datetime(day.year, day.month, day.day, tzinfo=timezone.utc) - VIETNAM_TZ_OFFSET
+        window_start = midnight_utc + timedelta(hours=CURSE_WINDOW_HOURS[0])
+        window_end = midnight_utc + timedelta(hours=CURSE_WINDOW_HOURS[1])
+        overlap = (min(end, window_end) - max(start, window_start)).total_seconds()
+        if overlap > 0:
+            total += overlap
+        day += timedelta(days=1)
+    return total
+
+
+def water_drained(state, start, end):
+    """Bars lost between two instants, with the curse counted only for the minutes it applied."""
+    if end <= start:
+        return 0.0
+    seconds = (end - start).total_seconds() + (CURSE_MULTIPLIER - 1.0) * _curse_seconds(state, start, end)
+    return seconds / 3600 * WATER_PER_HOUR
+
+
+def water_remaining(state, now=None):
+    """current_water is the level at last_action_time; this is the level now. Nothing is written."""
+    now = now or datetime.now(timezone.utc)
+    if state.current_water is None or state.last_action_time is None:
+        return state.current_water
+    return state.current_water - water_drained(state, _as_utc(state.last_action_time), now)
+
+
+def settle_water(state, now=None):
+    """Fold the water spent so far into current_water, so an action can change it and be persisted."""
+    now = now or datetime.now(timezone.utc)
+    state.current_water = water_remaining(state, now)
+    state.last_action_time = now
+